@@ -15,7 +15,7 @@ WORKFLOW:
   6. Applies Quantico font formatting to all data
 
 KEY FEATURES:
-  - Batch processing with adaptive delays to avoid API rate limits
+  - Feedback-driven (AIMD) request pacing and quota-aware Sheets batching
   - Handles suspended/unverified accounts gracefully
   - Cookie-based session persistence
   - Google Sheets API integration with error recovery
@@ -36,8 +36,9 @@ SCHEDULE:
 # ==================== IMPORTS & CONFIG ====================
 
 import warnings
-import os, sys, re, time, json, random, argparse
+import os, sys, re, time, json, random, argparse, queue, threading, asyncio, sqlite3, contextvars, contextlib, hashlib
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
 from colorama import Fore, Style, init as colorama_init
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
@@ -57,15 +58,25 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urljoin, urlparse
+from bs4 import BeautifulSoup
+
 import gspread
 from google.oauth2.service_account import Credentials
 from gspread.exceptions import WorksheetNotFound, APIError
+from gspread.utils import absolute_range_name, fill_gaps
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
+PROCESS_START = time.time()
 
 LOGIN_URL = "https://damadam.pk/login/"
 HOME_URL = "https://damadam.pk/"
-COOKIE_FILE = "damadam_cookies.pkl"
+COOKIE_FILE = os.getenv('COOKIE_FILE', 'damadam_cookies.json')
+LEGACY_COOKIE_FILE = "damadam_cookies.pkl"
+SESSION_CHECK_TIMEOUT = float(os.getenv('SESSION_CHECK_TIMEOUT', '10'))
 
 USERNAME = os.getenv('DAMADAM_USERNAME', '0utLawZ')  # Default for local testing
 PASSWORD = os.getenv('DAMADAM_PASSWORD', 'asdasd')  # Default for local testing
@@ -94,8 +105,51 @@ BATCH_SIZE = int(os.getenv('BATCH_SIZE', '20'))
 APPLY_FONT_FORMATTING = os.getenv('APPLY_FONT_FORMATTING', '').strip().lower() in {"1","true","yes","y","on"}
 MIN_DELAY = float(os.getenv('MIN_DELAY', '0.3'))
 MAX_DELAY = float(os.getenv('MAX_DELAY', '0.5'))
+POLITE_FLOOR = float(os.getenv('POLITE_FLOOR', '0.1'))          # fastest per-worker delay when the site is healthy
+POLITE_CEILING = float(os.getenv('POLITE_CEILING', '30'))       # slowest per-worker delay under backoff
+POLITE_STEP = float(os.getenv('POLITE_STEP', '0.05'))           # additive delay decrease per healthy request
+POLITE_SLOW_LATENCY = float(os.getenv('POLITE_SLOW_LATENCY', '8'))  # seconds; slower responses count as congestion
 PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '30'))
-SHEET_WRITE_DELAY = float(os.getenv('SHEET_WRITE_DELAY', '1.0'))
+LEAN_BROWSER = os.getenv('LEAN_BROWSER', '1').strip().lower() in {"1","true","yes","y","on"}  # eager loads, no images/media/fonts/ads
+PAGE_METRICS = os.getenv('PAGE_METRICS', '').strip().lower() in {"1","true","yes","y","on"}  # log bytes/load time per page from the Performance API
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.bmp",
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.m4a",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*googlesyndication.com*", "*doubleclick.net*", "*googleadservices.com*", "*adservice.google.*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*googletagservices.com*", "*facebook.net*",
+    "*amazon-adsystem.com*", "*scorecardresearch.com*", "*adnxs.com*", "*taboola.com*", "*outbrain.com*",
+] + [p.strip() for p in os.getenv('EXTRA_BLOCKED_URLS', '').split(',') if p.strip()]
+# Minutes from process start after which no new target is started; CI defaults to 50 to finish inside the 59-minute job limit
+RUN_DEADLINE_MINUTES = float(os.getenv('RUN_DEADLINE_MINUTES', '50' if os.getenv('GITHUB_ACTIONS') else '0'))
+DEADLINE_RESERVE_S = float(os.getenv('DEADLINE_RESERVE_S', '60'))  # kept back for draining writes, flush and the Dashboard row
+SHEETS_READ_QUOTA = int(os.getenv('SHEETS_READ_QUOTA', '60'))    # read requests/minute/user
+SHEETS_WRITE_QUOTA = int(os.getenv('SHEETS_WRITE_QUOTA', '60'))  # write requests/minute/user
+SHEETS_MAX_RETRIES = int(os.getenv('SHEETS_MAX_RETRIES', '6'))
+SHEET_FLUSH_SIZE = int(os.getenv('SHEET_FLUSH_SIZE', '20'))
+SHEET_FLUSH_INTERVAL = float(os.getenv('SHEET_FLUSH_INTERVAL', '30'))
+WRITE_QUEUE_SIZE = int(os.getenv('WRITE_QUEUE_SIZE', '50'))  # scraped results waiting for the Sheets writer before scrapers block
+TOUCH_UNCHANGED_ROWS = os.getenv('TOUCH_UNCHANGED_ROWS', '1').strip().lower() in {"1","true","yes","y","on"}  # refresh DATETIME SCRAP on unchanged rows
+NORMALIZE_CHUNK_RANGES = 500
+SCRAPE_ENGINE = os.getenv('SCRAPE_ENGINE', 'browser').strip().lower()  # browser | http
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+SCRAPE_WORKERS = int(os.getenv('SCRAPE_WORKERS', '1'))
+GLOBAL_MIN_INTERVAL = float(os.getenv('GLOBAL_MIN_INTERVAL', '0.2'))
+ASYNC_CONCURRENCY = int(os.getenv('ASYNC_CONCURRENCY', '8'))
+ASYNC_RATE = float(os.getenv('ASYNC_RATE', '4'))  # requests/second per host
+ASYNC_BURST = float(os.getenv('ASYNC_BURST', '4'))
+PROFILE_CACHE_PATH = os.getenv('PROFILE_CACHE_PATH', '').strip() or os.path.join(SCRIPT_DIR, 'profile_cache.sqlite3')
+PROFILE_CACHE_TTL = float(os.getenv('PROFILE_CACHE_TTL', '0'))  # seconds; 0 disables cache reads
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', '50000'))
+PROFILE_CACHE_MAX_AGE = float(os.getenv('PROFILE_CACHE_MAX_AGE', str(7*86400)))
+SOURCE_PRIORITY = os.getenv('SOURCE_PRIORITY', '')  # e.g. "Target:10,Tags:2"; weights in days of staleness
+PRIORITY_NEW_BONUS = float(os.getenv('PRIORITY_NEW_BONUS', '30'))  # never-scraped targets rank like rows this many days stale
+PRIORITY_MAX_AGE_DAYS = float(os.getenv('PRIORITY_MAX_AGE_DAYS', '30'))
+PRIORITY_FAILURE_PENALTY = float(os.getenv('PRIORITY_FAILURE_PENALTY', '2'))  # days subtracted per recent failure
+FAILURE_WINDOW = float(os.getenv('FAILURE_WINDOW', str(7*86400)))  # seconds a failed scrape keeps counting against a target
+JOURNAL_PATH = os.getenv('JOURNAL_PATH', '').strip() or os.path.join(SCRIPT_DIR, 'scrape_journal.jsonl')
+TAGS_CACHE_PATH = os.getenv('TAGS_CACHE_PATH', os.path.join(SCRIPT_DIR, 'tags_index.json')).strip()  # empty disables
+TRACE_PATH = os.getenv('TRACE_PATH', os.path.join(SCRIPT_DIR, 'run_trace.jsonl')).strip()  # empty disables the trace file
 
 COLUMN_ORDER = [
     "NICK NAME", "TAGS", "CITY", "GENDER", "MARRIED", "AGE", "JOINED", "FOLLOWERS", "STATUS", "POSTS", "INTRO", "SOURCE", "DATETIME SCRAP",
@@ -104,7 +158,11 @@ COLUMN_ORDER = [
 COLUMN_TO_INDEX = {name: idx for idx, name in enumerate(COLUMN_ORDER)}
 COLUMN_TLOG_HEADERS = ["Timestamp", "Nickname", "Change Type", "Fields", "Before", "After"]
 DASHBOARD_SHEET_NAME = "Dashboard"
+DASHBOARD_HEADERS = ["Run#","Timestamp","Profiles","Success","Failed","New","Updated","Unchanged","Trigger","Start","End",
+                     "Duration (s)","Profiles/min","P50 s/profile","P95 s/profile","Sheets Reads","Sheets Writes"]
 HIGHLIGHT_EXCLUDE_COLUMNS = {"LAST POST", "LAST POST TIME", "JOINED", "PROFILE LINK", "DATETIME SCRAP"}
+FINGERPRINT_EXCLUDE_COLUMNS = {"DATETIME SCRAP"}
+FINGERPRINT_COLUMNS = [i for i,c in enumerate(COLUMN_ORDER) if c not in FINGERPRINT_EXCLUDE_COLUMNS]
 SUSPENSION_INDICATORS = [
     "accounts suspend",
     "aik se zyada fake accounts",
@@ -173,6 +231,13 @@ def column_letter(i:int)->str:
         i-=1; res=chr(i%26+65)+res; i//=26
     return res
 
+def row_fingerprint(vals:list)->str:
+    # Digest of every column that matters; DATETIME SCRAP changes on each scrape and is left out
+    h=hashlib.blake2b(digest_size=16)
+    for i in FINGERPRINT_COLUMNS:
+        h.update((vals[i] if i<len(vals) else "").strip().encode('utf-8')); h.update(b"\x1f")
+    return h.hexdigest()
+
 def clean_data(v:str)->str:
     if not v: return ""
     v=str(v).strip().replace('\xa0',' ')
@@ -228,71 +293,47 @@ def parse_owner_since_to_date(text:str)->str:
         return convert_relative_date_to_absolute(text)
     return ""
 
-def get_friend_status(driver) -> str:
+def parse_friend_status_html(html:str) -> str:
     try:
         """
         // page ko lowercase karna safe matching ke liye zaroori
         """
-        try:
-            WebDriverWait(driver, 2).until(
-                EC.presence_of_element_located(
-                    (
-                        By.CSS_SELECTOR,
-                        "form[action*='/follow/remove/'], form[action*='/follow/add/'], img[src*='follow.svg'], img[src*='unfollow.svg'",
-                    )
-                )
-            )
-        except Exception:
-            pass
-
-        page = driver.page_source.lower()
-
-        """
-        // text original hi chahiye because FOLLOW / UNFOLLOW uppercase hota hai
-        """
-        text = driver.page_source
-
-        try:
-            imgs = driver.find_elements(By.CSS_SELECTOR, "img[src*='follow.svg'], img[src*='unfollow.svg']")
-            has_unfollow_icon = False
-            has_follow_icon = False
-            for img in imgs:
-                src = (img.get_attribute('src') or '').lower()
-                if 'unfollow.svg' in src:
-                    has_unfollow_icon = True
-                elif re.search(r"(^|/)follow\.svg(\?|$)", src, re.IGNORECASE):
-                    has_follow_icon = True
-            if has_unfollow_icon:
-                return "Yes"
-            if has_follow_icon:
-                return "No"
-        except Exception:
-            pass
+        page = (html or "").lower()
+        soup = BeautifulSoup(html or "", "html.parser")
+
+        has_unfollow_icon = False
+        has_follow_icon = False
+        for img in soup.select("img[src*='follow.svg'], img[src*='unfollow.svg']"):
+            src = (img.get('src') or '').lower()
+            if 'unfollow.svg' in src:
+                has_unfollow_icon = True
+            elif re.search(r"(^|/)follow\.svg(\?|$)", src, re.IGNORECASE):
+                has_follow_icon = True
+        if has_unfollow_icon:
+            return "Yes"
+        if has_follow_icon:
+            return "No"
 
-        try:
-            forms = driver.find_elements(By.CSS_SELECTOR, "form[action*='/follow/remove/'], form[action*='/follow/add/']")
-            has_remove = False
-            has_add = False
-            has_unfollow_text = False
-            has_follow_text = False
-            for frm in forms:
-                action = (frm.get_attribute('action') or '').lower()
-                frm_text = (frm.text or '').lower()
-                if '/follow/remove/' in action or action.endswith('/follow/remove'):
-                    has_remove = True
-                if '/follow/add/' in action or action.endswith('/follow/add'):
-                    has_add = True
-                if 'unfollow' in frm_text:
-                    has_unfollow_text = True
-                if re.search(r"\bfollow\b", frm_text, re.IGNORECASE) and 'unfollow' not in frm_text:
-                    has_follow_text = True
-
-            if has_remove or has_unfollow_text:
-                return "Yes"
-            if has_add or has_follow_text:
-                return "No"
-        except Exception:
-            pass
+        has_remove = False
+        has_add = False
+        has_unfollow_text = False
+        has_follow_text = False
+        for frm in soup.select("form[action*='/follow/remove/'], form[action*='/follow/add/']"):
+            action = (frm.get('action') or '').lower()
+            frm_text = frm.get_text(" ", strip=True).lower()
+            if '/follow/remove/' in action or action.endswith('/follow/remove'):
+                has_remove = True
+            if '/follow/add/' in action or action.endswith('/follow/add'):
+                has_add = True
+            if 'unfollow' in frm_text:
+                has_unfollow_text = True
+            if re.search(r"\bfollow\b", frm_text, re.IGNORECASE) and 'unfollow' not in frm_text:
+                has_follow_text = True
+
+        if has_remove or has_unfollow_text:
+            return "Yes"
+        if has_add or has_follow_text:
+            return "No"
 
         """
         // --- NOT FOLLOWING ---
@@ -331,71 +372,206 @@ def get_friend_status(driver) -> str:
     except Exception:
         return ""
 
+def get_friend_status(driver) -> str:
+    try:
+        WebDriverWait(driver, 2).until(
+            EC.presence_of_element_located(
+                (
+                    By.CSS_SELECTOR,
+                    "form[action*='/follow/remove/'], form[action*='/follow/add/'], img[src*='follow.svg'], img[src*='unfollow.svg']",
+                )
+            )
+        )
+    except Exception:
+        pass
+    try:
+        return parse_friend_status_html(driver.page_source)
+    except Exception:
+        return ""
+
+PAGE_WEIGHT_JS = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const res = performance.getEntriesByType('resource');
+return {
+  bytes: (nav.transferSize || 0) + res.reduce((n, r) => n + (r.transferSize || 0), 0),
+  resources: res.length,
+  dom_s: (nav.domContentLoadedEventEnd || 0) / 1000,
+  load_s: (nav.loadEventEnd || 0) / 1000,
+};
+"""
+
+def record_page_weight(driver, page:str):
+    # One extra script round-trip per page, so only with PAGE_METRICS on (compare LEAN_BROWSER=0 vs 1)
+    if not PAGE_METRICS: return
+    try:
+        w=driver.execute_script(PAGE_WEIGHT_JS) or {}
+        tracer.value("page_kb", (w.get("bytes") or 0)/1024, page=page, resources=w.get("resources"))
+        tracer.value("page_dom_s", w.get("dom_s") or 0.0, page=page)
+    except Exception:
+        pass
+
 def scrape_recent_post(driver, nickname:str)->dict:
     post_url=f"https://damadam.pk/profile/public/{nickname}"
     try:
-        driver.get(post_url)
+        started=time.time()
         try:
-            WebDriverWait(driver,5).until(EC.presence_of_element_located((By.CSS_SELECTOR,"article.mbl")))
+            with tracer.span("navigation", nick=nickname, page="posts"): driver.get(post_url)
+        except TimeoutException:
+            report_request(time.time()-started, None, timed_out=True); raise
+        report_request(time.time()-started)
+        try:
+            with tracer.span("element_wait", nick=nickname, page="posts"):
+                WebDriverWait(driver,5).until(EC.presence_of_element_located((By.CSS_SELECTOR,"article.mbl")))
         except TimeoutException:
             return {'LPOST':'','LDATE-TIME':''}
+        record_page_weight(driver, "posts")
 
-        recent_post=driver.find_element(By.CSS_SELECTOR,"article.mbl")
-        post_data={'LPOST':'','LDATE-TIME':''}
-
-        url_selectors=[
-            ("a[href*='/content/']", lambda h: h),
-            ("a[href*='/comments/text/']", lambda h: h),
-            ("a[href*='/comments/image/']", lambda h: h)
-        ]
-        for selector, formatter in url_selectors:
-            try:
-                link=recent_post.find_element(By.CSS_SELECTOR, selector)
-                href=link.get_attribute('href')
-                if href:
-                    formatted=formatter(href)
-                    if formatted:
-                        post_data['LPOST']=formatted
-                        break
-            except Exception:
-                continue
-
-        time_selectors=["span[itemprop='datePublished']","time[itemprop='datePublished']","span.cxs.cgy","time"]
-        for sel in time_selectors:
-            try:
-                time_elem=recent_post.find_element(By.CSS_SELECTOR, sel)
-                if time_elem.text.strip():
-                    post_data['LDATE-TIME']=parse_post_timestamp(time_elem.text.strip())
-                    break
-            except Exception:
-                continue
-        return post_data
+        with tracer.span("extraction", nick=nickname, page="posts"):
+            return parse_public_posts_html(driver.page_source, post_url)
     except Exception:
         return {'LPOST':'','LDATE-TIME':''}
 
-class AdaptiveDelay:
-    def __init__(self,mn,mx): self.base_min=mn; self.base_max=mx; self.min_delay=mn; self.max_delay=mx; self.hits=0; self.last=time.time()
-    def on_success(self):
-        if self.hits: self.hits-=1
-        if time.time()-self.last>10:
-            self.min_delay=max(self.base_min,self.min_delay*0.95); self.max_delay=max(self.base_max,self.max_delay*0.95); self.last=time.time()
-    def on_rate_limit(self):
-        self.hits+=1; factor=1+min(0.2*self.hits,1.0)
-        self.min_delay=min(3.0,self.min_delay*factor); self.max_delay=min(6.0,self.max_delay*factor)
-    def on_batch(self):
-        self.min_delay=min(3.0,max(self.base_min,self.min_delay*1.1)); self.max_delay=min(6.0,max(self.base_max,self.max_delay*1.1))
-    def sleep(self): time.sleep(random.uniform(self.min_delay,self.max_delay))
-
-adaptive=AdaptiveDelay(MIN_DELAY,MAX_DELAY)
+class PolitenessController:
+    # AIMD on the per-worker delay: healthy responses shave POLITE_STEP off, throttling/timeouts/slow pages double it
+    BACKOFF_STATUSES = {403, 429, 502, 503, 504}
+    # Doubling starts from at least this, so POLITE_FLOOR=0 cannot pin the delay at zero
+    MIN_BACKOFF = 0.1
+
+    def __init__(self, name:str="", initial:float|None=None, floor:float=POLITE_FLOOR, ceiling:float=POLITE_CEILING, step:float=POLITE_STEP, slow_latency:float=POLITE_SLOW_LATENCY):
+        self.name=name; self.floor=floor; self.ceiling=max(floor, ceiling); self.step=step; self.slow_latency=slow_latency
+        self.delay=min(self.ceiling, max(floor, initial if initial is not None else (MIN_DELAY+MAX_DELAY)/2))
+        self.requests=self.errors=self.timeouts=self.backoffs=0
+        self.ewma_latency=None; self.lock=threading.Lock()
+
+    def record(self, latency:float|None, status:int|None=200, timed_out:bool=False):
+        with self.lock:
+            self.requests+=1
+            if latency is not None:
+                self.ewma_latency=latency if self.ewma_latency is None else 0.8*self.ewma_latency+0.2*latency
+            if timed_out: self.timeouts+=1
+            bad=timed_out or status in self.BACKOFF_STATUSES or (latency is not None and latency>self.slow_latency)
+            if bad or (status is not None and status>=500):
+                self.errors+=1
+            if bad:
+                self.backoffs+=1
+                self.delay=min(self.ceiling, max(self.delay, self.floor, self.step, self.MIN_BACKOFF)*2)
+            else:
+                self.delay=max(self.floor, self.delay-self.step)
+
+    def sleep(self):
+        # +/-25% jitter so parallel workers do not fall into lockstep
+        with self.lock: d=self.delay
+        with tracer.span("sleep"): time.sleep(random.uniform(d*0.75, d*1.25))
+
+    def metrics(self)->dict:
+        with self.lock:
+            return {
+                "name": self.name,
+                "delay_s": round(self.delay, 3),
+                "rate_per_min": round(60.0/self.delay, 1) if self.delay>0 else None,
+                "ewma_latency_s": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+                "requests": self.requests,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "timeout_rate": round(self.timeouts/self.requests, 3) if self.requests else 0.0,
+                "backoffs": self.backoffs,
+            }
+
+# Controller of the worker making the current request; scrapers report into it without threading it through every call
+_politeness = contextvars.ContextVar("politeness", default=None)
+
+def report_request(latency:float|None, status:int|None=200, timed_out:bool=False):
+    ctl=_politeness.get()
+    if ctl: ctl.record(latency, status, timed_out)
+
+class RequestGate:
+    # Spaces page requests across all workers by at least min_interval seconds
+    def __init__(self,min_interval): self.min_interval=min_interval; self.lock=threading.Lock(); self.next_at=0.0
+    def wait(self):
+        with self.lock:
+            now=time.time(); wait=self.next_at-now
+            self.next_at=max(now,self.next_at)+self.min_interval
+        if wait>0:
+            with tracer.span("gate_wait"): time.sleep(wait)
+
+class PhaseTracer:
+    # Wall-clock spans per run phase; each span is a JSON line in TRACE_PATH and feeds the p50/p95 summary
+    def __init__(self):
+        self.durations={}; self.values={}; self.lock=threading.Lock(); self.fh=None
+
+    def open(self, path:str):
+        if path: self.fh=open(path, 'a', encoding='utf-8')
+
+    def add(self, phase:str, seconds:float, **fields):
+        with self.lock:
+            self.durations.setdefault(phase, []).append(seconds)
+            if self.fh:
+                self.fh.write(json.dumps({"ts": round(time.time(), 3), "phase": phase, "dur_s": round(seconds, 4),
+                                          "thread": threading.current_thread().name, **fields}, ensure_ascii=False)+"\n")
+
+    def value(self, metric:str, v:float, **fields):
+        # Non-time measurements (page weight etc.), summarized next to the phases
+        with self.lock:
+            self.values.setdefault(metric, []).append(v)
+            if self.fh:
+                self.fh.write(json.dumps({"ts": round(time.time(), 3), "metric": metric, "value": round(v, 3), **fields}, ensure_ascii=False)+"\n")
+
+    @contextlib.contextmanager
+    def span(self, phase:str, **fields):
+        started=time.perf_counter()
+        try: yield
+        finally: self.add(phase, time.perf_counter()-started, **fields)
+
+    @staticmethod
+    def percentile(values:list, q:float)->float|None:
+        if not values: return None
+        ordered=sorted(values)
+        return ordered[min(len(ordered)-1, int(q*len(ordered)))]
+
+    def summary(self)->dict:
+        with self.lock:
+            return {phase: {"n": len(v), "total_s": round(sum(v), 2), "p50_s": round(self.percentile(v, 0.5), 3),
+                            "p95_s": round(self.percentile(v, 0.95), 3)} for phase, v in self.durations.items()}
+
+    def value_summary(self)->dict:
+        with self.lock:
+            return {m: {"n": len(v), "avg": round(sum(v)/len(v), 3), "p50": round(self.percentile(v, 0.5), 3),
+                        "p95": round(self.percentile(v, 0.95), 3)} for m, v in self.values.items() if v}
+
+    def close(self, **run_fields):
+        with self.lock:
+            if not self.fh: return
+            self.fh.write(json.dumps({"ts": round(time.time(), 3), "phase": "run", **run_fields}, ensure_ascii=False)+"\n")
+            self.fh.close(); self.fh=None
+
+tracer = PhaseTracer()
 
 # ==================== BROWSER & LOGIN ====================
 
 def setup_browser():
+    with tracer.span("browser_launch"):
+        return _launch_browser()
+
+def _launch_browser():
     try:
         opts=Options(); opts.add_argument("--headless=new"); opts.add_argument("--window-size=1920,1080"); opts.add_argument("--disable-blink-features=AutomationControlled")
         opts.add_experimental_option('excludeSwitches',['enable-automation']); opts.add_experimental_option('useAutomationExtension',False)
         opts.add_argument("--no-sandbox"); opts.add_argument("--disable-dev-shm-usage"); opts.add_argument("--disable-gpu")
         opts.add_argument("--log-level=3")  # Suppress DevTools/Chrome noise
+        if LEAN_BROWSER:
+            # Only the DOM is scraped: return at DOMContentLoaded and skip everything that only paints or tracks
+            opts.page_load_strategy='eager'
+            opts.add_experimental_option('prefs', {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+                "profile.default_content_setting_values.geolocation": 2,
+                "profile.default_content_setting_values.media_stream": 2,
+            })
+            for arg in ("--blink-settings=imagesEnabled=false", "--mute-audio", "--autoplay-policy=user-gesture-required",
+                        "--disable-extensions", "--disable-background-networking", "--disable-sync", "--disable-default-apps",
+                        "--disable-component-update", "--no-first-run", "--disable-notifications",
+                        "--disable-features=Translate,MediaRouter,OptimizationHints,InterestFeedContentSuggestions,AutofillServerCommunication"):
+                opts.add_argument(arg)
         driver=None
         if CHROMEDRIVER_PATH and os.path.exists(CHROMEDRIVER_PATH):
             service = Service(executable_path=CHROMEDRIVER_PATH)
@@ -404,33 +580,96 @@ def setup_browser():
             driver = webdriver.Chrome(options=opts)
         driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
         driver.execute_script("Object.defineProperty(navigator,'webdriver',{get:()=>undefined})")
+        if LEAN_BROWSER:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                log_msg(f"Network blocking unavailable, relying on prefs: {e}")
         return driver
     except Exception as e:
         log_msg(f"Browser error: {e}"); return None
 
 def save_cookies(driver):
+    # JSON with the browser's user agent so the HTTP engine can reuse the session without Chrome
     try:
-        import pickle
-        with open(COOKIE_FILE,'wb') as f: pickle.dump(driver.get_cookies(), f)
-    except: pass
+        cookies=driver.get_cookies()
+        try: ua=driver.execute_script("return navigator.userAgent") or ""
+        except Exception: ua=""
+        # Session end: the Django sessionid expiry, else the last dated cookie to go
+        session_exp=[c['expiry'] for c in cookies if c.get('name')=='sessionid' and c.get('expiry')]
+        expiries=session_exp or [c['expiry'] for c in cookies if c.get('expiry')]
+        tmp=COOKIE_FILE+".tmp"
+        with open(tmp,'w',encoding='utf-8') as f:
+            json.dump({"expires_at": max(expiries) if expiries else None,
+                       "user_agent": ua.replace("HeadlessChrome","Chrome"), "cookies": cookies}, f)
+        os.replace(tmp, COOKIE_FILE)
+    except Exception as e:
+        log_msg(f"Cookie save failed: {e}")
 
-def load_cookies(driver):
+def load_saved_session()->dict|None:
+    # Unexpired cookies from COOKIE_FILE (or the old pickle), or None when nothing usable is left
     try:
-        import pickle, os
-        if not os.path.exists(COOKIE_FILE): return False
-        with open(COOKIE_FILE,'rb') as f: cookies=pickle.load(f)
-        for c in cookies:
-            try: driver.add_cookie(c)
-            except: pass
-        return True
-    except: return False
+        if os.path.exists(COOKIE_FILE):
+            with open(COOKIE_FILE, encoding='utf-8') as f: saved=json.load(f)
+        elif os.path.exists(LEGACY_COOKIE_FILE):
+            import pickle
+            with open(LEGACY_COOKIE_FILE,'rb') as f: saved={"cookies": pickle.load(f), "user_agent": ""}
+        else:
+            return None
+        now=time.time()
+        if saved.get("expires_at") and saved["expires_at"]<=now:
+            # Clearly expired: no point spending the HTTP session check on it
+            log_msg("Saved session has expired, logging in again")
+            return None
+        saved["cookies"]=[c for c in saved.get("cookies",[]) if not c.get('expiry') or c['expiry']>now]
+        return saved if saved["cookies"] else None
+    except Exception as e:
+        log_msg(f"Saved cookies unreadable: {e}")
+        return None
+
+_session_check={}
+
+def validate_session(saved:dict|None)->bool|None:
+    # One plain GET of HOME_URL with the saved cookies: True/False, or None if the site could not be reached
+    if not saved: return False
+    if "result" in _session_check: return _session_check["result"]
+    result=None
+    try:
+        session=new_http_session(1, saved)
+        with tracer.span("session_check"):
+            resp=session.get(HOME_URL, timeout=SESSION_CHECK_TIMEOUT)
+        logged_out='login' in resp.url.lower() or bool(re.search(r"name=['\"]pass['\"]", resp.text or ""))
+        result=resp.status_code==200 and not logged_out
+    except requests.RequestException as e:
+        log_msg(f"Session check failed: {e}")
+    _session_check["result"]=result
+    return result
+
+def _seed_browser(driver, saved:dict):
+    # Cookies can only be set for the current domain; the eager HOME_URL load just establishes it
+    driver.get(HOME_URL)
+    for c in saved["cookies"]:
+        try: driver.add_cookie({k:v for k,v in c.items() if k in {"name","value","domain","path","expiry","secure","httpOnly","sameSite"}})
+        except Exception: pass
 
 def login(driver)->bool:
+    with tracer.span("login"):
+        return _login(driver)
+
+def _login(driver)->bool:
     try:
-        driver.get(HOME_URL); time.sleep(2)
-        if load_cookies(driver): driver.refresh(); time.sleep(3); 
-        if 'login' not in driver.current_url.lower(): return True
-        driver.get(LOGIN_URL); time.sleep(3)
+        saved=load_saved_session()
+        valid=validate_session(saved)
+        if saved and valid is not False:
+            _seed_browser(driver, saved)
+            if valid:
+                log_msg("[OK] Saved session is valid, skipping login form")
+                return True
+            # Could not verify over HTTP; let the browser decide
+            driver.get(HOME_URL)
+            if 'login' not in driver.current_url.lower(): return True
+        driver.get(LOGIN_URL)
         for label,u,p in [("Account 1",USERNAME,PASSWORD),("Account 2",USERNAME_2,PASSWORD_2)]:
             if not u or not p: continue
             try:
@@ -438,10 +677,16 @@ def login(driver)->bool:
                 try: pw=driver.find_element(By.CSS_SELECTOR,"#pass, input[name='pass']")
                 except: pw=WebDriverWait(driver,8).until(EC.presence_of_element_located((By.CSS_SELECTOR,"input[type='password']")))
                 btn=driver.find_element(By.CSS_SELECTOR,"button[type='submit'], form button")
-                nick.clear(); nick.send_keys(u); time.sleep(0.5)
-                pw.clear(); pw.send_keys(p); time.sleep(0.5)
-                btn.click(); time.sleep(4)
-                if 'login' not in driver.current_url.lower(): save_cookies(driver); return True
+                nick.clear(); nick.send_keys(u)
+                pw.clear(); pw.send_keys(p)
+                btn.click()
+                try:
+                    WebDriverWait(driver,15).until(lambda d: 'login' not in d.current_url.lower())
+                except TimeoutException:
+                    log_msg(f"{label} login did not leave the login page")
+                    continue
+                save_cookies(driver); _session_check.clear()
+                return True
             except: continue
         return False
     except Exception as e:
@@ -478,44 +723,158 @@ def gsheets_client():
     except Exception as e:
         print(f"[ERROR] Google auth failed: {e}"); sys.exit(1)
 
+class TokenBucket:
+    def __init__(self, rate:float, capacity:float):
+        self.rate=rate; self.capacity=max(1.0, capacity); self.tokens=self.capacity
+        self.updated=time.monotonic(); self.lock=threading.Lock()
+
+    def acquire(self)->float:
+        if self.rate<=0: return 0.0
+        waited=0.0
+        while True:
+            with self.lock:
+                now=time.monotonic()
+                self.tokens=min(self.capacity, self.tokens+(now-self.updated)*self.rate); self.updated=now
+                if self.tokens>=1:
+                    self.tokens-=1
+                    return waited
+                wait=(1-self.tokens)/self.rate
+            time.sleep(wait); waited+=wait
+
+class SheetsThrottle:
+    # Every gspread call goes through here: per-minute read/write buckets plus backoff on quota and server errors
+    RETRY_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self, read_per_min:int=SHEETS_READ_QUOTA, write_per_min:int=SHEETS_WRITE_QUOTA, max_retries:int=SHEETS_MAX_RETRIES):
+        # Burst of ~10s of quota so a flush never drains the whole minute at once
+        self.buckets={
+            "read": TokenBucket(read_per_min/60.0, read_per_min/6.0),
+            "write": TokenBucket(write_per_min/60.0, write_per_min/6.0),
+        }
+        self.max_retries=max_retries
+        self.calls={"read":0,"write":0}; self.retries=0; self.throttled_s=0.0
+        self.lock=threading.Lock()
+
+    @staticmethod
+    def _status(e:Exception)->int|None:
+        code=getattr(e, 'code', None)
+        if isinstance(code, int) and code>0: return code
+        resp=getattr(e, 'response', None)
+        return getattr(resp, 'status_code', None)
+
+    @staticmethod
+    def _retry_after(e:Exception)->float|None:
+        try:
+            val=e.response.headers.get('Retry-After')
+            return float(val) if val else None
+        except Exception:
+            return None
+
+    def call(self, kind:str, fn, *args, idempotent:bool=True, **kwargs):
+        for attempt in range(self.max_retries+1):
+            waited=self.buckets[kind].acquire()
+            with self.lock:
+                self.calls[kind]+=1; self.throttled_s+=waited
+            try:
+                return fn(*args, **kwargs)
+            except (APIError, requests.ConnectionError, requests.Timeout) as e:
+                code=self._status(e) if isinstance(e, APIError) else None
+                # A 429 was rejected outright; anything else may have been applied, so only retry idempotent calls
+                retryable=(code==429) or (idempotent and (code in self.RETRY_CODES or not isinstance(e, APIError)))
+                if not retryable or attempt>=self.max_retries:
+                    raise
+                delay=self._retry_after(e) or min(64.0, 2**attempt)+random.uniform(0, 1)
+                with self.lock: self.retries+=1
+                log_msg(f"[API QUOTA] {code or type(e).__name__} on Sheets {kind}, retrying in {delay:.1f}s ({attempt+1}/{self.max_retries})")
+                time.sleep(delay)
+
 class Sheets:
     def __init__(self, client):
-        self.client=client; self.ss=client.open_by_url(GOOGLE_SHEET_URL)
+        self.client=client; self.api=SheetsThrottle()
+        self.ss=self.api.call("read", client.open_by_url, GOOGLE_SHEET_URL)
         self.tags_mapping={}
+        # Write-behind buffer: row -> values, nickname keys awaiting append, (row, col) -> change note
+        self._pending_updates={}
+        self._pending_appends=[]
+        self._pending_status={}
+        self._pending_touches={}
+        self._pending_notes={}
+        self._flush_tokens=[]; self.on_flush=None
+        self._last_flush=time.time()
+        self._worksheets={}; self._worksheets_listed=False
+        try:
+            self._worksheets={w.title:w for w in self.api.call("read", self.ss.worksheets)}; self._worksheets_listed=True
+        except Exception as e:
+            log_msg(f"Worksheet listing failed: {e}")
         self.ws=self._get_or_create("ProfilesTarget", cols=len(COLUMN_ORDER))
         self.target=self._get_or_create("Target", cols=4)
         self.tags_sheet=self._get_sheet_if_exists("Tags")
+        self.dashboard=None
+        try:
+            self.dashboard = self._get_or_create("Dashboard", cols=len(DASHBOARD_HEADERS))
+        except Exception as e:
+            log_msg(f"Dashboard setup failed: {e}")
+        # One values.batchGet for every grid the init steps and target reader need
+        self._load_snapshot([self.ws, self.target, self.tags_sheet, self.dashboard])
         # Ensure headers for ProfilesTarget
         try:
-            vals = self.ws.get_all_values()
+            vals = self.snapshot_values(self.ws)
             if not vals or not vals[0] or all(not c for c in vals[0]):
                 log_msg("Initializing ProfilesTarget headers...")
-                self.ws.append_row(COLUMN_ORDER)
+                self.api.call("write", self.ws.append_row, COLUMN_ORDER, idempotent=False)
+                vals.append(list(COLUMN_ORDER))
         except Exception as e:
             log_msg(f"Header init failed: {e}")
         # Ensure headers for Target sheet
         try:
-            tvals = self.target.get_all_values()
+            tvals = self.snapshot_values(self.target)
             if not tvals or not tvals[0] or all(not c for c in tvals[0]):
                 log_msg("Initializing Target headers...")
-                self.target.append_row(["Nickname","Status","Remarks","Source"])
+                self.api.call("write", self.target.append_row, ["Nickname","Status","Remarks","Source"], idempotent=False)
+                tvals.append(["Nickname","Status","Remarks","Source"])
         except Exception as e:
             log_msg(f"Target header init failed: {e}")
         # Dashboard worksheet
         try:
-            self.dashboard = self._get_or_create("Dashboard", cols=11)
-            dvals = self.dashboard.get_all_values()
-            expected = ["Run#","Timestamp","Profiles","Success","Failed","New","Updated","Unchanged","Trigger","Start","End"]
-            if not dvals or dvals[0] != expected:
-                self.dashboard.clear(); self.dashboard.append_row(expected)
+            if self.dashboard:
+                dvals = self.snapshot_values(self.dashboard)
+                expected = DASHBOARD_HEADERS
+                current = [c for c in (dvals[0] if dvals else []) if c]
+                if self.dashboard.col_count < len(expected):
+                    self.api.call("write", self.dashboard.add_cols, len(expected)-self.dashboard.col_count, idempotent=False)
+                if current and current != expected and current == expected[:len(current)]:
+                    # Older header: add the new columns in place and keep the run history
+                    self.api.call("write", self.dashboard.update, values=[expected], range_name=f"A1:{column_letter(len(expected)-1)}1")
+                    dvals[0] = list(expected)
+                elif not dvals or current != expected:
+                    self.api.call("write", self.dashboard.clear); self.api.call("write", self.dashboard.append_row, expected, idempotent=False)
+                    dvals[:] = [expected]
         except Exception as e:
             log_msg(f"Dashboard setup failed: {e}")
         self._migrate_profiles_target_columns()
         self._load_existing(); self._load_tags_mapping(); self.normalize_target_statuses()
 
+    def _load_snapshot(self, worksheets):
+        self._snapshot={}
+        sheets=[w for w in worksheets if w is not None]
+        if not sheets: return
+        try:
+            resp=self.api.call("read", self.ss.values_batch_get, [absolute_range_name(w.title) for w in sheets])
+            for w,vr in zip(sheets, resp.get("valueRanges",[])):
+                self._snapshot[w.title]=fill_gaps(vr.get("values",[]))
+            log_msg(f"Snapshot loaded: {', '.join(f'{t} ({len(v)} rows)' for t,v in self._snapshot.items())}")
+        except Exception as e:
+            log_msg(f"Snapshot read failed, falling back to per-sheet reads: {e}")
+
+    def snapshot_values(self, ws):
+        # Cached grid (mutable, kept in sync by local writes); a live read only if the snapshot missed it
+        if ws.title not in self._snapshot:
+            self._snapshot[ws.title]=self.api.call("read", ws.get_all_values)
+        return self._snapshot[ws.title]
+
     def apply_quantico_font(self):
         try:
-            sheets = self.ss.worksheets()
+            sheets = self.api.call("read", self.ss.worksheets)
             reqs = []
             for ws in sheets:
                 reqs.append({
@@ -536,26 +895,34 @@ class Sheets:
                     }
                 })
             if reqs:
-                self.ss.batch_update({"requests": reqs})
+                self.api.call("write", self.ss.batch_update, {"requests": reqs})
                 log_msg("Applied Quantico font to all sheets")
         except Exception as e:
             log_msg(f"Quantico font apply failed: {e}")
 
     def _get_or_create(self,name,cols=20,rows=1000):
-        try: return self.ss.worksheet(name)
+        if name in self._worksheets: return self._worksheets[name]
+        try: ws=self.api.call("read", self.ss.worksheet, name)
         except WorksheetNotFound:
-            return self.ss.add_worksheet(title=name, rows=rows, cols=cols)
+            ws=self.api.call("write", self.ss.add_worksheet, title=name, rows=rows, cols=cols)
+        self._worksheets[name]=ws
+        return ws
 
     def _get_sheet_if_exists(self,name):
+        if name in self._worksheets: return self._worksheets[name]
         try:
-            return self.ss.worksheet(name)
+            if self._worksheets_listed: raise WorksheetNotFound(name)
+            return self.api.call("read", self.ss.worksheet, name)
         except WorksheetNotFound:
             log_msg(f"{name} sheet not found, skipping optional features")
             return None
 
     def _migrate_profiles_target_columns(self):
         try:
-            headers = self.ws.row_values(1)
+            grid = self.snapshot_values(self.ws)
+            headers = list(grid[0]) if grid else []
+            while headers and not headers[-1]:
+                headers.pop()
             if not headers:
                 return
             to_remove = {"ID", "FRIEND", "MEHFIL NAME", "MEHFIL DATE"}
@@ -585,11 +952,14 @@ class Sheets:
                         }
                     }
                 )
-            self.ss.batch_update({"requests": reqs})
+            self.api.call("write", self.ss.batch_update, {"requests": reqs})
+            for r in grid:
+                for idx in sorted(set(idxs), reverse=True):
+                    if idx < len(r): del r[idx]
 
             end_col_letter = column_letter(len(COLUMN_ORDER)-1)
-            self.ws.update(values=[COLUMN_ORDER], range_name=f"A1:{end_col_letter}1")
-            time.sleep(SHEET_WRITE_DELAY)
+            self.api.call("write", self.ws.update, values=[COLUMN_ORDER], range_name=f"A1:{end_col_letter}1")
+            grid[0][:len(COLUMN_ORDER)] = COLUMN_ORDER
             log_msg("ProfilesTarget columns migrated (removed ID/FRIEND/MEHFIL)")
         except Exception as e:
             log_msg(f"ProfilesTarget migration failed: {e}")
@@ -599,21 +969,30 @@ class Sheets:
 
     def _load_existing(self):
         self.existing={}
-        rows=self.ws.get_all_values()[1:]
+        all_rows=self.snapshot_values(self.ws)
+        self._row_count=len(all_rows)
+        rows=all_rows[1:]
         nick_idx = COLUMN_TO_INDEX.get("NICK NAME", 0)
         for i,r in enumerate(rows,start=2):
             if len(r) > nick_idx and r[nick_idx].strip():
-                self.existing[r[nick_idx].strip().lower()]={'row':i,'data':r}
+                self.existing[r[nick_idx].strip().lower()]={'row':i,'data':r,'fp':row_fingerprint(r)}
         log_msg(f"Loaded {len(self.existing)} existing")
 
     def _load_tags_mapping(self):
+        # nickname -> ordered set of tag names (dict keys); joined into the TAGS cell only in write_profile
         self.tags_mapping={}
         if not self.tags_sheet:
             return
         try:
-            all_values=self.tags_sheet.get_all_values()
+            all_values=self.snapshot_values(self.tags_sheet)
             if not all_values or len(all_values)<2:
                 return
+            digest=hashlib.blake2b(json.dumps(all_values, ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+            cached=self._read_tags_cache(digest)
+            if cached is not None:
+                self.tags_mapping=cached
+                log_msg(f"Loaded {len(self.tags_mapping)} tags (Tags sheet unchanged, cached index)")
+                return
             headers=all_values[0]
             for col_idx, header in enumerate(headers):
                 tag_name=clean_data(header)
@@ -623,26 +1002,52 @@ class Sheets:
                     if col_idx < len(row):
                         nickname=row[col_idx].strip()
                         if nickname:
-                            key=nickname.lower()
-                            if key in self.tags_mapping:
-                                if tag_name not in self.tags_mapping[key]:
-                                    self.tags_mapping[key]+=f", {tag_name}"
-                            else:
-                                self.tags_mapping[key]=tag_name
+                            self.tags_mapping.setdefault(nickname.lower(), {})[tag_name]=None
+            self._write_tags_cache(digest)
             log_msg(f"Loaded {len(self.tags_mapping)} tags")
         except Exception as e:
             log_msg(f"Tags load failed: {e}")
+        finally:
+            # The grid is only needed to build the index
+            if self.tags_sheet: self._snapshot.pop(self.tags_sheet.title, None)
+
+    def _read_tags_cache(self, digest:str)->dict|None:
+        if not TAGS_CACHE_PATH or not os.path.exists(TAGS_CACHE_PATH): return None
+        try:
+            with open(TAGS_CACHE_PATH, encoding='utf-8') as f: cached=json.load(f)
+            if cached.get("hash")!=digest: return None
+            return {k: dict.fromkeys(v) for k,v in cached["index"].items()}
+        except Exception as e:
+            log_msg(f"Tags cache unreadable, rebuilding: {e}")
+            return None
+
+    def _write_tags_cache(self, digest:str):
+        if not TAGS_CACHE_PATH: return
+        try:
+            tmp=TAGS_CACHE_PATH+".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"hash": digest, "index": {k: list(v) for k,v in self.tags_mapping.items()}}, f, ensure_ascii=False)
+            os.replace(tmp, TAGS_CACHE_PATH)
+        except Exception as e:
+            log_msg(f"Tags cache write failed: {e}")
 
     def _highlight(self,row_idx,indices):
         return  # Formatting disabled as per user request
 
     def _add_notes(self,row_idx,indices,before,new_vals):
-        if not indices: return
-        reqs=[]
+        # Queued; the flush sends them in the same spreadsheets.batchUpdate as the row values
         for idx in indices:
-            note=f"Before: {before.get(COLUMN_ORDER[idx], '')}\nAfter: {new_vals[idx]}"
-            reqs.append({"updateCells":{"range":{"sheetId":self.ws.id,"startRowIndex":row_idx-1,"endRowIndex":row_idx,"startColumnIndex":idx,"endColumnIndex":idx+1},"rows":[{"values":[{"note":note}]}],"fields":"note"}})
-        if reqs: self.ss.batch_update({"requests":reqs})
+            self._pending_notes[(row_idx, idx)]=f"Before: {before.get(COLUMN_ORDER[idx], '')}\nAfter: {new_vals[idx]}"
+
+    @staticmethod
+    def _cells_request(sheet_id:int, row:int, col:int, values:list)->dict:
+        # One row of cells from (row, col), row 1-based; text is stored as-is like RAW values, empty strings clear the cell
+        return {"updateCells":{"range":{"sheetId":sheet_id,"startRowIndex":row-1,"endRowIndex":row,"startColumnIndex":col,"endColumnIndex":col+len(values)},
+                "rows":[{"values":[{"userEnteredValue":{"stringValue":str(v)}} if v not in (None,"") else {} for v in values]}],"fields":"userEnteredValue"}}
+
+    @staticmethod
+    def _note_request(sheet_id:int, row:int, col:int, note:str)->dict:
+        return {"updateCells":{"range":{"sheetId":sheet_id,"startRowIndex":row-1,"endRowIndex":row,"startColumnIndex":col,"endColumnIndex":col+1},"rows":[{"values":[{"note":note}]}],"fields":"note"}}
 
     def update_target_status(self,row,status,remarks):
         lower = (status or "").lower().strip()
@@ -652,19 +1057,16 @@ class Sheets:
             status = TARGET_STATUS_DONE
         elif lower.startswith('error') or lower.startswith('unverified') or lower.startswith('suspended') or lower.startswith('banned') or lower == TARGET_STATUS_ERROR.lower():
             status = TARGET_STATUS_ERROR
-        # API quota handling
-        for attempt in range(3):
-            try:
-                self.target.update(values=[[status]], range_name=f"B{row}")
-                self.target.update(values=[[remarks]], range_name=f"C{row}")
-                time.sleep(SHEET_WRITE_DELAY)
-                break
-            except APIError as e:
-                if '429' in str(e):
-                    log_msg('[API QUOTA] 429 error: Write quota exceeded, sleeping 60s...')
-                    time.sleep(60)
-                else:
-                    raise
+        # Status and remarks go out as one B:C cell pair with the next profile batch
+        self._pending_status[row]=[status, remarks]
+        tvals=self._snapshot.get(self.target.title)
+        if tvals and 0 < row-1 < len(tvals):
+            tvals[row-1][1:3]=[status, remarks]
+        self.flush_if_due()
+
+    def track(self, token):
+        # Token is handed to on_flush once everything queued so far has reached the sheet
+        self._flush_tokens.append(token)
 
     def update_dashboard(self, metrics:dict):
         try:
@@ -680,14 +1082,20 @@ class Sheets:
                 metrics.get("Trigger", os.getenv('GITHUB_EVENT_NAME','manual')),
                 metrics.get("Start", get_pkt_time().strftime("%d-%b-%y %I:%M %p")),
                 metrics.get("End", get_pkt_time().strftime("%d-%b-%y %I:%M %p")),
+                metrics.get("Duration",""),
+                metrics.get("Profiles/min",""),
+                metrics.get("P50",""),
+                metrics.get("P95",""),
+                metrics.get("Sheets Reads", self.api.calls["read"]),
+                metrics.get("Sheets Writes", self.api.calls["write"]),
             ]
-            self.dashboard.append_row(row)
+            self.api.call("write", self.dashboard.append_row, row, idempotent=False)
         except Exception as e:
             log_msg(f"Dashboard update failed: {e}")
 
     def normalize_target_statuses(self):
         try:
-            vals=self.target.get_all_values()
+            vals=self.snapshot_values(self.target)
             if not vals or len(vals)<2: return
             updates=[]
             for idx,row in enumerate(vals[1:],start=2):
@@ -705,20 +1113,33 @@ class Sheets:
                     new_status = TARGET_STATUS_PENDING
                 if new_status:
                     updates.append((idx,new_status))
+                    row[1]=new_status
+            if not updates: return
+            started=time.time()
+            # Merge consecutive changed rows into one range; unchanged cells are never rewritten
+            data=[]
             for row_idx,val in updates:
-                self.target.update(values=[[val]], range_name=f"B{row_idx}")
-                time.sleep(SHEET_WRITE_DELAY)
+                if data and data[-1]["end"]==row_idx-1:
+                    data[-1]["values"].append([val]); data[-1]["end"]=row_idx
+                else:
+                    data.append({"start":row_idx,"end":row_idx,"values":[[val]]})
+            data=[{"range":absolute_range_name(self.target.title, f"B{d['start']}:B{d['end']}"),"values":d["values"]} for d in data]
+            for i in range(0, len(data), NORMALIZE_CHUNK_RANGES):
+                self.api.call("write", self.ss.values_batch_update, {"valueInputOption":"RAW","data":data[i:i+NORMALIZE_CHUNK_RANGES]})
+            log_msg(f"Normalized {len(updates)} target statuses in {time.time()-started:.1f}s")
         except Exception as e:
             log_msg(f"Normalize statuses failed: {e}")
 
-    def write_profile(self, profile:dict, old_row:int|None=None):
+    def write_profile(self, profile:dict, old_row:int|None=None, keep_scrape_time:bool=False):
+        # keep_scrape_time: the profile was not fetched now (cache hit), so its own DATETIME SCRAP stands
         nickname=(profile.get("NICK NAME") or "").strip()
         if not nickname: return {"status":"error","error":"Missing nickname","changed_fields":[]}
         if profile.get("LAST POST TIME"): profile["LAST POST TIME"]=convert_relative_date_to_absolute(profile["LAST POST TIME"])
-        profile["DATETIME SCRAP"]=get_pkt_time().strftime("%d-%b-%y %I:%M %p")
-        tags_val=self.tags_mapping.get(nickname.lower())
-        if tags_val:
-            profile["TAGS"]=tags_val
+        if not (keep_scrape_time and profile.get("DATETIME SCRAP")):
+            profile["DATETIME SCRAP"]=get_pkt_time().strftime("%d-%b-%y %I:%M %p")
+        tags=self.tags_mapping.get(nickname.lower())
+        if tags:
+            profile["TAGS"]=", ".join(tags)
         vals=[]
         for c in COLUMN_ORDER:
             v=clean_data(profile.get(c,""))
@@ -727,173 +1148,504 @@ class Sheets:
         if ex:
             before={COLUMN_ORDER[i]:(ex['data'][i] if i<len(ex['data']) else "") for i in range(len(COLUMN_ORDER))}
             changed=[i for i,col in enumerate(COLUMN_ORDER) if col not in HIGHLIGHT_EXCLUDE_COLUMNS and (before.get(col,"" ) or "") != (vals[i] or "")]
-            # Update in place (overwrite row)
             rownum=ex['row']
-            end_col_letter = column_letter(len(COLUMN_ORDER)-1)
-            self.ws.update(values=[vals], range_name=f"A{rownum}:{end_col_letter}{rownum}")
-            if changed:
-                self._add_notes(rownum,changed,before,vals)
-            self.existing[key]={'row':rownum,'data':vals}
+            fp=row_fingerprint(vals)
+            same=ex.get('fp')==fp
+            ex['data']=vals; ex['fp']=fp
+            if rownum is None:
+                # Still waiting in the append buffer; the flush picks up the latest data
+                pass
+            elif same:
+                # Nothing but the scrape time differs: no row rewrite, at most the one timestamp cell
+                if TOUCH_UNCHANGED_ROWS:
+                    self._queue_touch(rownum, vals[COLUMN_TO_INDEX["DATETIME SCRAP"]])
+            else:
+                # Update in place (overwrite row)
+                self._queue_row_update(rownum, vals)
+                if changed:
+                    self._add_notes(rownum,changed,before,vals)
             status="updated" if changed else "unchanged"
             result={"status":status,"changed_fields":[COLUMN_ORDER[i] for i in changed]}
         else:
-            self.ws.append_row(vals)
-            last_row=len(self.ws.get_all_values())
-            self.existing[key]={'row':last_row,'data':vals}
+            self.existing[key]={'row':None,'data':vals,'fp':row_fingerprint(vals)}
+            self._pending_appends.append(key)
             result={"status":"new","changed_fields":list(COLUMN_ORDER)}
-        time.sleep(SHEET_WRITE_DELAY)
+        self.flush_if_due()
         return result
 
+    def _queue_row_update(self, rownum:int, vals:list):
+        self._pending_updates[rownum] = vals
+        self._pending_touches.pop(rownum, None)
+
+    def _queue_touch(self, rownum:int, scraped_at:str):
+        # Rides along with the next status/row batch instead of forcing a flush of its own
+        if rownum in self._pending_updates:
+            return
+        self._pending_touches[rownum] = scraped_at
+
+    def _notify_flushed(self):
+        tokens, self._flush_tokens = self._flush_tokens, []
+        if tokens and self.on_flush:
+            try: self.on_flush(tokens)
+            except Exception as e: log_msg(f"Flush callback failed: {e}")
+
+    def _appended_first_row(self, resp)->int:
+        # values.append reports where the rows landed, e.g. "'ProfilesTarget'!A120:R124"
+        try:
+            rng=(resp or {}).get("updates",{}).get("updatedRange","")
+            m=re.search(r"![A-Z]+(\d+)", rng)
+            if m: return int(m.group(1))
+        except Exception:
+            pass
+        return self._row_count+1
+
+    def pending_writes(self)->int:
+        return len(self._pending_updates) + len(self._pending_appends)
+
+    def flush_if_due(self):
+        # Flushes once the buffer reaches SHEET_FLUSH_SIZE or SHEET_FLUSH_INTERVAL has passed
+        if self.pending_writes() >= SHEET_FLUSH_SIZE or time.time() - self._last_flush >= SHEET_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self)->bool:
+        if not self.pending_writes() and not (self._pending_status or self._pending_touches or self._pending_notes):
+            self._last_flush=time.time()
+            self._notify_flushed()
+            return True
+        with tracer.span("sheet_flush", rows=self.pending_writes(), statuses=len(self._pending_status)):
+            return self._flush()
+
+    def _flush(self)->bool:
+        try:
+            if self._pending_appends:
+                keys=self._pending_appends
+                resp=self.api.call("write", self.ws.append_rows, [self.existing[k]['data'] for k in keys], idempotent=False)
+                first_row=self._appended_first_row(resp)
+                for i,k in enumerate(keys):
+                    self.existing[k]['row']=first_row+i
+                self._row_count=max(self._row_count, first_row+len(keys)-1)
+                self._pending_appends=[]
+            if self._pending_updates or self._pending_status or self._pending_touches or self._pending_notes:
+                # Profile rows, DATETIME SCRAP touches, change notes and Target B:C cells in a single spreadsheets.batchUpdate
+                touch_idx=COLUMN_TO_INDEX["DATETIME SCRAP"]
+                reqs=[self._cells_request(self.ws.id, r, 0, vals) for r,vals in self._pending_updates.items()]
+                reqs+=[self._cells_request(self.ws.id, r, touch_idx, [v]) for r,v in self._pending_touches.items()]
+                reqs+=[self._note_request(self.ws.id, r, c, note) for (r,c),note in self._pending_notes.items()]
+                reqs+=[self._cells_request(self.target.id, r, 1, sv) for r,sv in self._pending_status.items()]
+                self.api.call("write", self.ss.batch_update, {"requests":reqs})
+                self._pending_updates={}; self._pending_status={}; self._pending_touches={}; self._pending_notes={}
+            self._notify_flushed()
+            return True
+        except Exception as e:
+            log_msg(f"[ERROR] Sheet flush failed ({self.pending_writes()} rows, {len(self._pending_status)} statuses pending): {e}")
+            return False
+        finally:
+            self._last_flush=time.time()
+
+# ==================== PROFILE CACHE ====================
+
+class ProfileCache:
+    # Last extracted profile per lowercase nickname, so recently scraped targets skip the browser
+    def __init__(self, path:str=PROFILE_CACHE_PATH, ttl:float=PROFILE_CACHE_TTL, max_entries:int=PROFILE_CACHE_MAX_ENTRIES, max_age:float=PROFILE_CACHE_MAX_AGE):
+        self.path=path; self.ttl=ttl; self.max_entries=max_entries; self.max_age=max_age
+        self.hits=self.misses=self.writes=0
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS profiles (nickname TEXT PRIMARY KEY, data TEXT NOT NULL, scraped_at REAL NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_scraped_at ON profiles(scraped_at)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS failures (nickname TEXT NOT NULL, failed_at REAL NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_failures_nickname ON failures(nickname)")
+        self.conn.commit()
+
+    def get(self, nickname:str)->dict|None:
+        if self.ttl<=0: return None
+        with self.lock:
+            row=self.conn.execute("SELECT data, scraped_at FROM profiles WHERE nickname=?", (nickname.strip().lower(),)).fetchone()
+            if row and time.time()-row[1] <= self.ttl:
+                self.hits+=1
+                data=json.loads(row[0])
+                if not data.get("DATETIME SCRAP"):
+                    # Entries written before the field existed: the fetch time is scraped_at
+                    data["DATETIME SCRAP"]=(datetime.fromtimestamp(row[1], timezone.utc).replace(tzinfo=None)+timedelta(hours=5)).strftime("%d-%b-%y %I:%M %p")
+                return data
+            self.misses+=1
+            return None
+
+    def put(self, nickname:str, data:dict):
+        payload={k:v for k,v in data.items() if not k.startswith('__') or k=='__skip_reason'}
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO profiles (nickname, data, scraped_at) VALUES (?,?,?)", (nickname.strip().lower(), json.dumps(payload), time.time()))
+            self.conn.commit()
+            self.writes+=1
+
+    def record_failure(self, nickname:str):
+        with self.lock:
+            self.conn.execute("INSERT INTO failures (nickname, failed_at) VALUES (?,?)", (nickname.strip().lower(), time.time()))
+            self.conn.commit()
+
+    def clear_failures(self, nickname:str):
+        with self.lock:
+            self.conn.execute("DELETE FROM failures WHERE nickname=?", (nickname.strip().lower(),))
+            self.conn.commit()
+
+    def recent_failures(self, window:float=FAILURE_WINDOW)->dict:
+        with self.lock:
+            rows=self.conn.execute("SELECT nickname, COUNT(*) FROM failures WHERE failed_at >= ? GROUP BY nickname", (time.time()-window,)).fetchall()
+        return dict(rows)
+
+    def evict(self)->int:
+        with self.lock:
+            self.conn.execute("DELETE FROM failures WHERE failed_at < ?", (time.time()-FAILURE_WINDOW,))
+            cur=self.conn.execute("DELETE FROM profiles WHERE scraped_at < ?", (time.time()-self.max_age,))
+            removed=cur.rowcount
+            if self.max_entries>0:
+                cur=self.conn.execute("DELETE FROM profiles WHERE nickname NOT IN (SELECT nickname FROM profiles ORDER BY scraped_at DESC LIMIT ?)", (self.max_entries,))
+                removed+=cur.rowcount
+            self.conn.commit()
+            return removed
+
+    def stats(self)->dict:
+        with self.lock:
+            entries=self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        lookups=self.hits+self.misses
+        return {"hits":self.hits,"misses":self.misses,"writes":self.writes,"entries":entries,"hit_rate":(self.hits/lookups if lookups else 0.0)}
+
+    def close(self):
+        try:
+            with self.lock: self.conn.close()
+        except Exception:
+            pass
+
+# ==================== SCRAPE JOURNAL ====================
+
+class ScrapeJournal:
+    # Append-only JSON lines: a "scraped" entry before the Sheets write, a "commit" entry once it has landed
+    def __init__(self, path:str=JOURNAL_PATH):
+        self.path=path; self.lock=threading.Lock(); self._seq=0
+        self._prefix=f"{int(time.time())}-{os.getpid()}"
+        self._trim_torn_tail()
+        self._fh=open(path, "a", encoding="utf-8")
+
+    def _trim_torn_tail(self):
+        # A killed run can leave a partial last line; cut back to the last newline so the next append starts clean
+        try:
+            with open(self.path, "rb+") as f:
+                size=f.seek(0, os.SEEK_END)
+                if size==0: return
+                f.seek(size-1)
+                if f.read(1)==b"\n": return
+                pos=size
+                while pos>0:
+                    step=min(4096, pos); pos-=step
+                    f.seek(pos); chunk=f.read(step)
+                    cut=chunk.rfind(b"\n")
+                    if cut!=-1:
+                        pos+=cut+1; break
+                f.truncate(pos); f.flush(); os.fsync(f.fileno())
+        except FileNotFoundError:
+            pass
+
+    def _append(self, entry:dict):
+        self._fh.write(json.dumps(entry, ensure_ascii=False)+"\n")
+        self._fh.flush(); os.fsync(self._fh.fileno())
+
+    def record(self, target:dict, prof:dict)->str:
+        with self.lock:
+            self._seq+=1; jid=f"{self._prefix}-{self._seq}"
+            payload={k:v for k,v in prof.items() if not k.startswith('__') or k in {'__skip_reason','__from_cache'}}
+            self._append({"op":"scraped","id":jid,"ts":time.time(),"target":{"nickname":target['nickname'],"row":target['row'],"source":target.get('source','Target')},"profile":payload})
+            return jid
+
+    def commit(self, ids:list):
+        if not ids: return
+        with self.lock:
+            self._append({"op":"commit","ids":list(ids),"ts":time.time()})
+
+    def pending(self)->list:
+        entries={}; committed=set()
+        with self.lock:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        try: e=json.loads(line)
+                        except ValueError: continue  # torn last line from a killed run
+                        if e.get("op")=="scraped": entries[e["id"]]=e
+                        elif e.get("op")=="commit": committed.update(e.get("ids",[]))
+            except FileNotFoundError:
+                return []
+        return [e for jid,e in entries.items() if jid not in committed]
+
+    def compact(self):
+        keep=self.pending()
+        with self.lock:
+            self._fh.close()
+            tmp=self.path+".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for e in keep: f.write(json.dumps(e, ensure_ascii=False)+"\n")
+            os.replace(tmp, self.path)
+            self._fh=open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        try: self._fh.close()
+        except Exception: pass
+
+def record_profile_result(sheets:Sheets, row:int, prof:dict, note:str="")->str:
+    # Queues the profile row and its Target status; returns "error" or the write status
+    skip_reason = prof.get('__skip_reason')
+    nick = prof.get('NICK NAME','')
+    with tracer.span("sheet_write", nick=nick):
+        result = sheets.write_profile(prof, old_row=row, keep_scrape_time=bool(prof.get('__from_cache')))
+    if skip_reason:
+        with tracer.span("status_update", nick=nick):
+            sheets.update_target_status(row, "Error", f"{skip_reason}{note} @ {get_pkt_time().strftime('%I:%M %p')}")
+        return "error"
+    status = result.get("status","error") if result else "error"
+    if status not in {"new","updated","unchanged"}:
+        raise RuntimeError(result.get("error","Write failed") if result else "Write failed")
+    with tracer.span("status_update", nick=nick):
+        sheets.update_target_status(row, "Done", f"{status}{note} @ {get_pkt_time().strftime('%I:%M %p')}")
+    return status
+
+def replay_journal(sheets:Sheets, journal:ScrapeJournal)->int:
+    entries=journal.pending()
+    if not entries: return 0
+    log_msg(f"Replaying {len(entries)} uncommitted journal entries...")
+    tvals=sheets.snapshot_values(sheets.target)
+    replayed=0
+    for e in entries:
+        try:
+            t=e["target"]; nick=t["nickname"].strip(); row=t["row"]
+            # The Target sheet may have been edited since; find the row by nickname if it moved
+            if not (0 < row-1 < len(tvals) and tvals[row-1] and tvals[row-1][0].strip().lower()==nick.lower()):
+                row=next((i for i,r in enumerate(tvals[1:], start=2) if r and r[0].strip().lower()==nick.lower()), None)
+            prof=dict(e["profile"]); prof['SOURCE']=t.get("source") or prof.get('SOURCE') or 'Target'
+            if row:
+                record_profile_result(sheets, row, prof, " (replayed)")
+            else:
+                sheets.write_profile(prof, keep_scrape_time=bool(prof.get('__from_cache')))
+            sheets.track(e["id"])
+            replayed+=1
+        except Exception as ex:
+            log_msg(f"[ERROR] Journal replay failed for {e.get('id')}: {ex}")
+    if sheets.flush():
+        log_msg(f"[OK] Replayed {replayed} journal entries")
+    return replayed
+
 # ==================== TARGET PROCESSING ====================
 
 def get_pending_targets(sheets:Sheets):
-    rows=sheets.target.get_all_values()[1:]
+    rows=sheets.snapshot_values(sheets.target)[1:]
     out=[]
     for idx,row in enumerate(rows,start=2):
         nick=(row[0] if len(row)>0 else '').strip()
         status=(row[1] if len(row)>1 else '').strip()
+        remarks=(row[2] if len(row)>2 else '').strip()
         source=(row[3] if len(row)>3 else 'Target').strip() or 'Target'
         norm=status.lower()
         is_pending=(not status) or (status == TARGET_STATUS_PENDING) or ("pending" in norm)
         if nick and is_pending:
-            out.append({'nickname':nick,'row':idx,'source':source})
+            out.append({'nickname':nick,'row':idx,'source':source,'remarks':remarks})
+    return out
+
+def parse_source_priority(spec:str)->dict:
+    out={}
+    for part in (spec or "").split(','):
+        name,_,weight=part.partition(':')
+        try:
+            if name.strip(): out[name.strip().lower()]=float(weight)
+        except ValueError:
+            log_msg(f"Ignoring bad SOURCE_PRIORITY entry: {part}")
     return out
 
+def target_score(sheets:Sheets, t:dict, failures:dict, source_weights:dict, now:datetime)->float:
+    # In days of staleness: never scraped ranks like PRIORITY_NEW_BONUS days old, each recent failure costs PRIORITY_FAILURE_PENALTY
+    ex=sheets.existing.get(t['nickname'].strip().lower())
+    if not ex:
+        score=PRIORITY_NEW_BONUS
+    else:
+        idx=COLUMN_TO_INDEX["DATETIME SCRAP"]
+        scraped=ex['data'][idx] if idx<len(ex['data']) else ""
+        try:
+            age=(now-datetime.strptime(scraped.strip(), "%d-%b-%y %I:%M %p")).total_seconds()/86400
+        except ValueError:
+            age=PRIORITY_MAX_AGE_DAYS
+        score=min(max(age, 0.0), PRIORITY_MAX_AGE_DAYS)
+    fails=failures.get(t['nickname'].strip().lower(), 0)
+    if not fails and t.get('remarks','').lower().startswith('retry needed'):
+        fails=1
+    return score + source_weights.get((t.get('source') or 'Target').lower(), 0.0) - PRIORITY_FAILURE_PENALTY*fails
+
+def prioritize_targets(sheets:Sheets, targets:list, failures:dict|None=None)->list:
+    # Most valuable refresh first; ties keep sheet order so equal rows are still worked top-down
+    now=get_pkt_time(); failures=failures or {}; weights=parse_source_priority(SOURCE_PRIORITY)
+    scored=[(target_score(sheets, t, failures, weights, now), t) for t in targets]
+    scored.sort(key=lambda st: -st[0])
+    if scored:
+        new=sum(1 for t in targets if t['nickname'].strip().lower() not in sheets.existing)
+        log_msg(f"Scheduling {len(targets)} targets: {new} never scraped, top score {scored[0][0]:.1f}, bottom {scored[-1][0]:.1f}")
+    return [t for _,t in scored]
+
 # ==================== PROFILE SCRAPING ====================
 
-def scrape_profile(driver, nickname:str)->dict|None:
+def _new_profile_data(nickname:str, url:str)->dict:
+    return {
+        "NICK NAME":nickname,
+        "TAGS":"",
+        "CITY":"",
+        "GENDER":"",
+        "MARRIED":"",
+        "AGE":"",
+        "JOINED":"",
+        "FOLLOWERS":"",
+        "STATUS":"Normal",
+        "POSTS":"",
+        "INTRO":"",
+        "SOURCE":"Target",
+        "DATETIME SCRAP":get_pkt_time().strftime("%d-%b-%y %I:%M %p"),
+        "LAST POST":"",
+        "LAST POST TIME":"",
+        "IMAGE":"",
+        "PROFILE LINK":url.rstrip('/'),
+        "POST URL":f"https://damadam.pk/profile/public/{nickname}",
+    }
+
+def _node_text(node)->str:
+    return node.get_text(" ", strip=True) if node is not None else ""
+
+def parse_profile_html(html:str, nickname:str, url:str|None=None)->dict|None:
+    # Mirrors the Selenium selector fallbacks in scrape_profile, on one in-process DOM parse
+    url=url or f"https://damadam.pk/users/{nickname}/"
+    soup=BeautifulSoup(html or "", "html.parser")
+    if soup.select_one("h1.cxl.clb.lsp") is None:
+        return None
+    data=_new_profile_data(nickname, url)
+    page_source=html
+
+    if detect_suspension_reason(page_source):
+        data['STATUS'] = 'Banned'
+        data['INTRO'] = "Account Suspended"[:250]
+        data['__skip_reason'] = 'Account Suspended'
+        return data
+    if 'account suspended' in page_source.lower():
+        data['STATUS'] = 'Banned'
+        data['__skip_reason'] = 'Account Suspended'
+        return data
+    if (
+        re.search(r">\s*unverified\s*user\s*<", page_source, re.IGNORECASE)
+        or 'background:tomato' in page_source
+        or 'style="background:tomato"' in page_source.lower()
+        or soup.select_one("div[style*='tomato']") is not None
+    ):
+        data['STATUS'] = 'Unverified'
+        data['__skip_reason'] = 'skipped coz of unverified user'
+        return data
+
+    for sel in ["span.cl.sp.lsp.nos","span.cl",".ow span.nos"]:
+        text=_node_text(soup.select_one(sel))
+        if text:
+            data['INTRO']=clean_text(text)
+            break
+
+    fields={'City:':'CITY','Gender:':'GENDER','Married:':'MARRIED','Age:':'AGE','Joined:':'JOINED'}
+    for label,key in fields.items():
+        label_node=next((b for b in soup.find_all('b') if any(label in str(t) for t in b.find_all(string=True, recursive=False))), None)
+        if label_node is None: continue
+        value=_node_text(label_node.find_next_sibling('span'))
+        if not value: continue
+        if key=='JOINED':
+            data[key]=convert_relative_date_to_absolute(value)
+        elif key=='GENDER':
+            low=value.lower()
+            data[key]='Female' if 'female' in low else ('Male' if 'male' in low else '')
+        elif key=='MARRIED':
+            low=value.lower()
+            data[key]='Yes' if low in {'yes','married'} else ('No' if low in {'no','single','unmarried'} else '')
+        else:
+            data[key]=clean_data(value)
+
+    for sel in ["span.cl.sp.clb",".cl.sp.clb"]:
+        match=re.search(r'(\d+)', _node_text(soup.select_one(sel)))
+        if match:
+            data['FOLLOWERS']=match.group(1)
+            break
+
+    for sel in ["a[href*='/profile/public/'] button div:first-child","a[href*='/profile/public/'] button div"]:
+        match=re.search(r'(\d+)', _node_text(soup.select_one(sel)))
+        if match:
+            data['POSTS']=match.group(1)
+            break
+
+    for sel in ["img[src*='avatar-imgs']","img[src*='avatar']","div[style*='whitesmoke'] img[src*='cloudfront.net']"]:
+        img=soup.select_one(sel)
+        src=urljoin(url, img.get('src')) if img is not None and img.get('src') else ''
+        if src and ('avatar' in src or 'cloudfront.net' in src):
+            data['IMAGE']=src.replace('/thumbnail/','/')
+            break
+
+    return data
+
+def needs_recent_post(data:dict, previous:list|None=None)->bool:
+    if data.get('__skip_reason') or not data.get('POSTS') or data['POSTS']=='0':
+        return False
+    if previous:
+        prev=lambda col: (previous[COLUMN_TO_INDEX[col]] if COLUMN_TO_INDEX[col] < len(previous) else "").strip()
+        # Same post count as the stored row and a known last post: nothing new to fetch
+        if prev("POSTS")==data['POSTS'] and prev("LAST POST"):
+            data['LAST POST']=prev("LAST POST")
+            data['LAST POST TIME']=prev("LAST POST TIME")
+            data['__recent_post_reused']=True
+            return False
+    return True
+
+def parse_public_posts_html(html:str, base_url:str="https://damadam.pk/")->dict:
+    post_data={'LPOST':'','LDATE-TIME':''}
+    recent_post=BeautifulSoup(html or "", "html.parser").select_one("article.mbl")
+    if recent_post is None:
+        return post_data
+    for selector in ["a[href*='/content/']","a[href*='/comments/text/']","a[href*='/comments/image/']"]:
+        link=recent_post.select_one(selector)
+        if link is not None and link.get('href'):
+            post_data['LPOST']=urljoin(base_url, link['href'])
+            break
+    for sel in ["span[itemprop='datePublished']","time[itemprop='datePublished']","span.cxs.cgy","time"]:
+        text=_node_text(recent_post.select_one(sel))
+        if text:
+            post_data['LDATE-TIME']=parse_post_timestamp(text)
+            break
+    return post_data
+
+
+def scrape_profile(driver, nickname:str, previous:list|None=None)->dict|None:
     url=f"https://damadam.pk/users/{nickname}/"
     try:
         log_msg(f"[SCRAPING] {nickname}")
-        driver.get(url)
-        WebDriverWait(driver,10).until(EC.presence_of_element_located((By.CSS_SELECTOR,"h1.cxl.clb.lsp")))
-
-        page_source=driver.page_source
-        now=get_pkt_time()
-        suspend_reason=detect_suspension_reason(page_source)
-        data={
-            "NICK NAME":nickname,
-            "TAGS":"",
-            "CITY":"",
-            "GENDER":"",
-            "MARRIED":"",
-            "AGE":"",
-            "JOINED":"",
-            "FOLLOWERS":"",
-            "STATUS":"Normal",
-            "POSTS":"",
-            "INTRO":"",
-            "SOURCE":"Target",
-            "DATETIME SCRAP":now.strftime("%d-%b-%y %I:%M %p"),
-            "LAST POST":"",
-            "LAST POST TIME":"",
-            "IMAGE":"",
-            "PROFILE LINK":url.rstrip('/'),
-            "POST URL":f"https://damadam.pk/profile/public/{nickname}",
-        }
-
-        if suspend_reason:
-            data['STATUS'] = 'Banned'
-            data['INTRO'] = "Account Suspended"[:250]
-            data['__skip_reason'] = 'Account Suspended'
-            return data
-
-        if 'account suspended' in page_source.lower():
-            data['STATUS'] = 'Banned'
-            data['__skip_reason'] = 'Account Suspended'
-            return data
-        elif (
-            re.search(r">\s*unverified\s*user\s*<", page_source, re.IGNORECASE)
-            or 'background:tomato' in page_source
-            or 'style="background:tomato"' in page_source.lower()
-        ):
-            data['STATUS'] = 'Unverified'
-            data['__skip_reason'] = 'skipped coz of unverified user'
+        started=time.time()
+        try:
+            with tracer.span("navigation", nick=nickname, page="profile"): driver.get(url)
+            with tracer.span("element_wait", nick=nickname, page="profile"):
+                WebDriverWait(driver,10).until(EC.presence_of_element_located((By.CSS_SELECTOR,"h1.cxl.clb.lsp")))
+        except TimeoutException:
+            report_request(time.time()-started, None, timed_out=True); raise
+        report_request(time.time()-started)
+        record_page_weight(driver, "profile")
+
+        # One page_source round-trip; every field is extracted in-process
+        with tracer.span("extraction", nick=nickname, page="profile"):
+            data=parse_profile_html(driver.page_source, nickname, url)
+        if data is None:
+            log_msg(f"[ERROR] Profile page not available for {nickname}")
+            return None
+        if data.get('__skip_reason'):
             return data
-        else:
-            try:
-                driver.find_element(By.CSS_SELECTOR, "div[style*='tomato']")
-                data['STATUS'] = 'Unverified'
-                data['__skip_reason'] = 'skipped coz of unverified user'
-                return data
-            except Exception:
-                data['STATUS'] = 'Normal'
-
-        for sel in ["span.cl.sp.lsp.nos","span.cl",".ow span.nos"]:
-            try:
-                intro=driver.find_element(By.CSS_SELECTOR, sel)
-                if intro.text.strip():
-                    data['INTRO']=clean_text(intro.text)
-                    break
-            except Exception:
-                pass
-
-        fields={'City:':'CITY','Gender:':'GENDER','Married:':'MARRIED','Age:':'AGE','Joined:':'JOINED'}
-        for label,key in fields.items():
-            try:
-                elem=driver.find_element(By.XPATH,f"//b[contains(text(), '{label}')]/following-sibling::span[1]")
-                value=elem.text.strip()
-                if not value: continue
-                if key=='JOINED':
-                    data[key]=convert_relative_date_to_absolute(value)
-                elif key=='GENDER':
-                    low=value.lower()
-                    if 'female' in low:
-                        data[key] = 'Female'
-                    elif 'male' in low:
-                        data[key] = 'Male'
-                    else:
-                        data[key] = ''
-                elif key=='MARRIED':
-                    low=value.lower()
-                    if low in {'yes','married'}:
-                        data[key] = 'Yes'
-                    elif low in {'no','single','unmarried'}:
-                        data[key] = 'No'
-                    else:
-                        data[key] = ''
-                else:
-                    data[key]=clean_data(value)
-            except Exception:
-                continue
-
-        for sel in ["span.cl.sp.clb",".cl.sp.clb"]:
-            try:
-                followers=driver.find_element(By.CSS_SELECTOR, sel)
-                match=re.search(r'(\d+)', followers.text)
-                if match:
-                    data['FOLLOWERS']=match.group(1)
-                    break
-            except Exception:
-                pass
-
-        for sel in ["a[href*='/profile/public/'] button div:first-child","a[href*='/profile/public/'] button div"]:
-            try:
-                posts=driver.find_element(By.CSS_SELECTOR, sel)
-                match=re.search(r'(\d+)', posts.text)
-                if match:
-                    data['POSTS']=match.group(1)
-                    break
-            except Exception:
-                pass
-
-        for sel in ["img[src*='avatar-imgs']","img[src*='avatar']","div[style*='whitesmoke'] img[src*='cloudfront.net']"]:
-            try:
-                img=driver.find_element(By.CSS_SELECTOR, sel)
-                src=img.get_attribute('src')
-                if src and ('avatar' in src or 'cloudfront.net' in src):
-                    data['IMAGE']=src.replace('/thumbnail/','/')
-                    break
-            except Exception:
-                pass
 
-        if data.get('POSTS') and data['POSTS']!='0':
-            time.sleep(1)
-            post_data=scrape_recent_post(driver, nickname)
+        if needs_recent_post(data, previous):
+            with tracer.span("sleep"): time.sleep(1)
+            with tracer.span("recent_post", nick=nickname):
+                post_data=scrape_recent_post(driver, nickname)
             data['LAST POST']=clean_data(post_data.get('LPOST',''))
             data['LAST POST TIME']=post_data.get('LDATE-TIME','')
 
-        log_msg(f"[OK] Extracted: {data['GENDER']}, {data['CITY']}, Posts: {data['POSTS']}, Friend: {data.get('FRIEND','')}")
+        log_msg(f"[OK] Extracted: {data['GENDER']}, {data['CITY']}, Posts: {data['POSTS']}")
 
         return data
     except TimeoutException:
@@ -906,6 +1658,433 @@ def scrape_profile(driver, nickname:str)->dict|None:
         log_msg(f"[ERROR] Error scraping {nickname}: {str(e)[:60]}")
         return None
 
+# ==================== HTTP ENGINE ====================
+
+def new_http_session(pool_size:int=HTTP_POOL_SIZE, saved:dict|None=None)->requests.Session:
+    session=requests.Session()
+    retry=Retry(total=2, backoff_factor=0.5, status_forcelist=[502,503,504], allowed_methods=["GET","HEAD"])
+    adapter=HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter); session.mount("http://", adapter)
+    if saved:
+        if saved.get("user_agent"): session.headers["User-Agent"]=saved["user_agent"]
+        for c in saved.get("cookies",[]):
+            session.cookies.set(c['name'], c['value'], domain=c.get('domain'), path=c.get('path','/'))
+    return session
+
+def http_session_from_driver(driver, pool_size:int=HTTP_POOL_SIZE)->requests.Session:
+    try:
+        ua=(driver.execute_script("return navigator.userAgent") or "").replace("HeadlessChrome","Chrome")
+    except Exception:
+        ua=""
+    return new_http_session(pool_size, {"user_agent": ua, "cookies": driver.get_cookies()})
+
+class HttpScraper:
+    def __init__(self, session:requests.Session):
+        self.session=session
+
+    def fetch(self, url:str)->str|None:
+        started=time.time()
+        try:
+            with tracer.span("navigation", url=url): resp=self.session.get(url, timeout=PAGE_LOAD_TIMEOUT)
+        except requests.Timeout:
+            report_request(time.time()-started, None, timed_out=True); raise
+        report_request(time.time()-started, resp.status_code)
+        if 'login' in resp.url.lower() and 'login' not in url.lower():
+            raise RuntimeError("Session expired (redirected to login)")
+        if resp.status_code!=200:
+            return None
+        return resp.text
+
+    def fetch_profile(self, nickname:str)->dict|None:
+        url=f"https://damadam.pk/users/{nickname}/"
+        html=self.fetch(url)
+        with tracer.span("extraction", nick=nickname, page="profile"):
+            return parse_profile_html(html, nickname, url)
+
+    def fetch_recent_post(self, nickname:str, data:dict)->dict:
+        post_url=f"https://damadam.pk/profile/public/{nickname}"
+        html=self.fetch(post_url) or ""
+        with tracer.span("extraction", nick=nickname, page="posts"):
+            post_data=parse_public_posts_html(html, post_url)
+        data['LAST POST']=clean_data(post_data.get('LPOST',''))
+        data['LAST POST TIME']=post_data.get('LDATE-TIME','')
+        return data
+
+    def scrape_profile(self, nickname:str, previous:list|None=None)->dict|None:
+        try:
+            log_msg(f"[SCRAPING] {nickname}")
+            data=self.fetch_profile(nickname)
+            if data is None:
+                log_msg(f"[ERROR] Profile page not available for {nickname}")
+                return None
+            if needs_recent_post(data, previous):
+                with tracer.span("recent_post", nick=nickname): self.fetch_recent_post(nickname, data)
+            if not data.get('__skip_reason'):
+                log_msg(f"[OK] Extracted: {data['GENDER']}, {data['CITY']}, Posts: {data['POSTS']}")
+            return data
+        except requests.Timeout:
+            log_msg(f"[TIMEOUT] Timeout while scraping {nickname}")
+            return None
+        except Exception as e:
+            log_msg(f"[ERROR] Error scraping {nickname}: {str(e)[:60]}")
+            return None
+
+class AsyncTokenBucket:
+    def __init__(self, rate:float, capacity:float):
+        self.rate=rate; self.capacity=max(1.0, capacity); self.tokens=self.capacity
+        self.updated=time.monotonic(); self._lock=None
+
+    async def acquire(self):
+        if self.rate<=0: return
+        if self._lock is None: self._lock=asyncio.Lock()
+        async with self._lock:
+            while True:
+                now=time.monotonic()
+                self.tokens=min(self.capacity, self.tokens+(now-self.updated)*self.rate); self.updated=now
+                if self.tokens>=1:
+                    self.tokens-=1; return
+                await asyncio.sleep((1-self.tokens)/self.rate)
+
+class AsyncHttpScraper:
+    # Overlaps page fetches: a bounded semaphore caps in-flight requests, a token bucket per host caps the rate
+    def __init__(self, http:HttpScraper, concurrency:int=ASYNC_CONCURRENCY, rate:float=ASYNC_RATE, burst:float=ASYNC_BURST):
+        self.http=http; self.concurrency=max(1, concurrency); self.rate=rate; self.burst=burst
+        # Pipeline-wide AIMD: its delay is the spacing between requests, i.e. the bucket rate is 1/delay (capped at ASYNC_RATE)
+        self.controller=PolitenessController(name="async", initial=(1.0/rate if rate>0 else None))
+        self._loop=None; self._sem=None; self._buckets={}
+
+    def effective_rate(self)->float:
+        if self.rate<=0: return self.rate
+        return min(self.rate, 1.0/max(self.controller.delay, 1e-3))
+
+    async def _request(self, url:str, fn, *args):
+        loop=asyncio.get_running_loop()
+        if self._loop is not loop:
+            # asyncio primitives are bound to one event loop; rebuild them for each run
+            self._loop=loop; self._sem=asyncio.Semaphore(self.concurrency); self._buckets={}
+        bucket=self._buckets.setdefault(urlparse(url).netloc, AsyncTokenBucket(self.rate, self.burst))
+        _politeness.set(self.controller)
+        async with self._sem:
+            bucket.rate=self.effective_rate()
+            await bucket.acquire()
+            # requests is blocking; the pooled session is shared by the executor threads
+            return await asyncio.to_thread(fn, *args)
+
+    async def scrape_profile(self, nickname:str, previous:list|None=None)->dict|None:
+        try:
+            log_msg(f"[SCRAPING] {nickname}")
+            data=await self._request(f"https://damadam.pk/users/{nickname}/", self.http.fetch_profile, nickname)
+            if data is None:
+                log_msg(f"[ERROR] Profile page not available for {nickname}")
+                return None
+            if needs_recent_post(data, previous):
+                started=time.perf_counter()
+                await self._request(f"https://damadam.pk/profile/public/{nickname}", self.http.fetch_recent_post, nickname, data)
+                tracer.add("recent_post", time.perf_counter()-started, nick=nickname)
+            if not data.get('__skip_reason'):
+                log_msg(f"[OK] Extracted: {data['GENDER']}, {data['CITY']}, Posts: {data['POSTS']}")
+            return data
+        except requests.Timeout:
+            log_msg(f"[TIMEOUT] Timeout while scraping {nickname}")
+            return None
+        except Exception as e:
+            log_msg(f"[ERROR] Error scraping {nickname}: {str(e)[:60]}")
+            return None
+
+# ==================== RUN LOOP ====================
+
+def start_browser_worker(drivers:list):
+    drv=setup_browser()
+    if not drv: return None
+    drivers.append(drv)
+    if not login(drv):
+        log_msg("[ERROR] Worker login failed"); return None
+    return lambda nick, previous=None: scrape_profile(drv, nick, previous)
+
+class SheetWriter:
+    # The only thread touching Sheets during a run: scrapers enqueue results and get back to fetching pages
+    def __init__(self, sheets:Sheets, maxsize:int=WRITE_QUEUE_SIZE):
+        self.sheets=sheets; self.queue=queue.Queue(max(1, maxsize))
+        self.thread=threading.Thread(target=self._run, name="sheet-writer", daemon=True)
+        self.jobs=0; self.blocked_s=0.0; self._stats_lock=threading.Lock()
+
+    def start(self):
+        self.thread.start()
+
+    def submit(self, fn, *args):
+        # Blocks while the queue is full, so a throttled Sheets API slows scraping instead of growing memory
+        try:
+            self.queue.put_nowait((fn, args))
+        except queue.Full:
+            started=time.perf_counter()
+            with tracer.span("queue_wait"): self.queue.put((fn, args))
+            # Several scraper threads can be blocked here at once
+            with self._stats_lock: self.blocked_s+=time.perf_counter()-started
+
+    def _run(self):
+        while True:
+            try:
+                job=self.queue.get(timeout=1.0)
+            except queue.Empty:
+                # Idle: honour SHEET_FLUSH_INTERVAL even when no new result arrives
+                self.sheets.flush_if_due(); continue
+            if job is None: return
+            fn, args = job
+            try: fn(*args)
+            except Exception as e: log_msg(f"[ERROR] Sheets writer job failed: {e}")
+            self.jobs+=1
+
+    def close(self):
+        # Everything queued before the sentinel is written; the caller flushes what is still buffered
+        if not self.thread.is_alive(): return
+        self.queue.put(None)
+        self.thread.join()
+
+class ScrapeRun:
+    def __init__(self, sheets:Sheets, targets:list, batch_size:int, cache:ProfileCache|None=None, journal:ScrapeJournal|None=None, deadline:float|None=None):
+        self.sheets=sheets; self.total=len(targets); self.batch_size=batch_size; self.cache=cache; self.journal=journal
+        self.deadline=deadline; self.deadline_hit=False
+        self.queue=queue.Queue()
+        for t in targets: self.queue.put(t)
+        self.writer=SheetWriter(sheets)
+        # Guards counters, in-flight rows and progress updates; Sheets writes are serialized by the writer thread
+        self.lock=threading.Lock(); self.stop=threading.Event()
+        self.gate=RequestGate(GLOBAL_MIN_INTERVAL)
+        self.in_flight={}; self.drivers=[]; self.controllers=[]
+        self.success=self.failed=self.suspended_count=self.processed=0
+        self.recent_post_skips=0
+        self.run_stats={"new":0,"updated":0,"unchanged":0}
+        self.start_time=time.time()
+        self.progress=None; self.task_id=None
+
+    def _previous_row(self, t:dict)->list|None:
+        ex=self.sheets.existing.get(t['nickname'].strip().lower())
+        return ex['data'] if ex else None
+
+    def _from_cache(self, t:dict)->dict|None:
+        prof=self.cache.get(t['nickname']) if self.cache else None
+        if prof:
+            log_msg(f"[OK] {t['nickname']} served from cache")
+            prof['__from_cache']=True
+        return prof
+
+    def _to_cache(self, t:dict, prof:dict|None):
+        if self.cache and prof and not prof.get('__from_cache'):
+            try: self.cache.put(t['nickname'], prof)
+            except Exception as e: log_msg(f"Profile cache write failed: {e}")
+
+    def _record(self, t:dict, prof:dict, jid:str|None=None):
+        # Runs on the writer thread
+        try:
+            status = record_profile_result(self.sheets, t['row'], prof, " (cached)" if prof.get('__from_cache') else "")
+        except Exception as e:
+            self._record_failure(t, e); return
+        if self.cache and status != "error":
+            try: self.cache.clear_failures(t['nickname'])
+            except Exception as e: log_msg(f"Failure log update failed: {e}")
+        with self.lock:
+            if prof.get('__recent_post_reused'):
+                self.recent_post_skips += 1
+            if status == "error":
+                self.failed += 1
+            else:
+                self.success += 1
+                self.run_stats[status] += 1
+        if jid: self.sheets.track(jid)
+
+    def _record_failure(self, t:dict, error:Exception):
+        self.sheets.update_target_status(t['row'], "Pending", f"Retry needed: {error}")
+        if self.cache:
+            try: self.cache.record_failure(t['nickname'])
+            except Exception as e: log_msg(f"Failure log update failed: {e}")
+        with self.lock: self.failed += 1
+
+    def _out_of_time(self, per_profile:float|None)->bool:
+        # per_profile is the caller's own EWMA, so each worker stops once its next profile would overrun
+        if not self.deadline: return False
+        remaining=self.deadline-time.time()
+        if remaining > (per_profile or 0.0): return False
+        with self.lock:
+            if not self.deadline_hit:
+                self.deadline_hit=True
+                log_msg(f"[DEADLINE] {max(remaining,0):.0f}s left, ~{per_profile or 0:.1f}s per profile: no new targets, {self.queue.qsize()} stay pending")
+        return True
+
+    @staticmethod
+    def _ewma(prev:float|None, sample:float)->float:
+        return sample if prev is None else 0.7*prev+0.3*sample
+
+    def _begin(self, t:dict):
+        with self.lock:
+            self.in_flight[t['row']]=t
+            eta = calculate_eta(self.processed, self.total, self.start_time)
+            self.progress.update(self.task_id, description=f"[{eta}] {t['nickname']}")
+
+    def _finish(self, t:dict, prof:dict|None, error:Exception|None=None):
+        row = t['row']; source = t.get('source','Target') or 'Target'
+        try:
+            if error: raise error
+            if not prof:
+                raise RuntimeError("Profile scrape failed")
+            prof['SOURCE'] = source
+            jid = self.journal.record(t, prof) if self.journal else None
+            # After an interrupt the journal keeps the result for the next run's replay
+            if self.stop.is_set(): return
+            self.writer.submit(self._record, t, prof, jid)
+        except Exception as e:
+            if not self.stop.is_set():
+                self.writer.submit(self._record_failure, t, e)
+        finally:
+            with self.lock:
+                self.in_flight.pop(row, None)
+                if not self.stop.is_set():
+                    self.processed += 1
+                    self.progress.advance(self.task_id)
+
+    def process(self, scrape, t:dict)->bool:
+        # Returns True when a page was fetched (cache hits need no politeness delay)
+        self._begin(t)
+        prof=self._from_cache(t)
+        if prof:
+            self._finish(t, prof)
+            return False
+        error=None
+        with tracer.span("profile", nick=t['nickname']):
+            try:
+                self.gate.wait()
+                prof = scrape(t['nickname'], self._previous_row(t))
+                self._to_cache(t, prof)
+            except Exception as e:
+                error=e
+            self._finish(t, prof, error)
+        return True
+
+    def worker(self, wid:int, factory):
+        try:
+            scrape = factory()
+            if not scrape:
+                log_msg(f"[ERROR] Worker {wid} could not start"); return
+            polite=PolitenessController(name=f"worker-{wid}")
+            with self.lock: self.controllers.append(polite)
+            _politeness.set(polite)
+            done=0; per_profile=None
+            while not self.stop.is_set():
+                if self._out_of_time(per_profile): return
+                try: t=self.queue.get_nowait()
+                except queue.Empty: return
+                started=time.time()
+                if not self.process(scrape, t): continue
+                done += 1
+                if self.batch_size > 0 and done % self.batch_size == 0:
+                    m=polite.metrics()
+                    log_msg(f"Worker {wid}: {done} done, delay {m['delay_s']}s (~{m['rate_per_min']}/min), latency {m['ewma_latency_s']}s, {m['timeouts']} timeouts")
+                polite.sleep()
+                per_profile=self._ewma(per_profile, time.time()-started)
+        except Exception as e:
+            log_msg(f"[ERROR] Worker {wid} stopped: {e}")
+
+    def _progress(self):
+        return Progress(
+            SpinnerColumn(style="cyan"),
+            TextColumn("{task.description}"),
+            BarColumn(bar_width=30),
+            TextColumn("{task.completed}/{task.total}"),
+            TimeElapsedColumn(),
+            TimeRemainingColumn(),
+            console=console,
+            transient=False,
+        )
+
+    def _drain_writer(self, interrupted:bool):
+        if interrupted:
+            # Stop new results first so the drain ends; what is already queued still reaches the sheet
+            self.stop.set()
+            log_msg(f"Draining {self.writer.queue.qsize()} queued Sheets writes...")
+        self.writer.close()
+
+    def run(self, factories:list):
+        self.writer.start(); interrupted=True
+        try:
+            with self._progress() as progress:
+                self.progress=progress
+                self.task_id = progress.add_task("Scraping profiles", total=self.total)
+                threads=[threading.Thread(target=self.worker, args=(wid, f), daemon=True) for wid,f in enumerate(factories)]
+                for th in threads: th.start()
+                # Short joins keep the main thread responsive to KeyboardInterrupt
+                while any(th.is_alive() for th in threads):
+                    for th in threads: th.join(0.5)
+            interrupted=False
+        finally:
+            self._drain_writer(interrupted)
+
+    async def _async_worker(self, scraper:AsyncHttpScraper):
+        per_profile=None
+        while not self.stop.is_set():
+            if self._out_of_time(per_profile): return
+            try: t=self.queue.get_nowait()
+            except queue.Empty: return
+            self._begin(t)
+            prof=self._from_cache(t); error=None
+            if prof:
+                await self._finish_off_loop(t, prof)
+                continue
+            started=time.perf_counter()
+            try:
+                prof = await scraper.scrape_profile(t['nickname'], self._previous_row(t))
+                self._to_cache(t, prof)
+            except Exception as e:
+                error=e
+            # Journal fsync and a full writer queue block; keep them off the event loop
+            await self._finish_off_loop(t, prof, error)
+            took=time.perf_counter()-started
+            tracer.add("profile", took, nick=t['nickname'])
+            per_profile=self._ewma(per_profile, took)
+
+    async def _finish_off_loop(self, t:dict, prof:dict|None, error:Exception|None=None):
+        loop=asyncio.get_running_loop()
+        await loop.run_in_executor(self._finish_pool, contextvars.copy_context().run, self._finish, t, prof, error)
+
+    def run_async(self, scraper:AsyncHttpScraper):
+        with self.lock: self.controllers.append(scraper.controller)
+        self.writer.start(); interrupted=True
+        # Separate pools: the default executor (min(32, cpu+4) threads) would cap fetches on small runners,
+        # and a _finish blocked on writer backpressure must not hold a fetch thread
+        workers=min(scraper.concurrency, self.total)
+        self._finish_pool=ThreadPoolExecutor(max_workers=2, thread_name_prefix="finish")
+        try:
+            with self._progress() as progress:
+                self.progress=progress
+                self.task_id = progress.add_task("Scraping profiles", total=self.total)
+                async def _main():
+                    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max(1, scraper.concurrency), thread_name_prefix="fetch"))
+                    await asyncio.gather(*(self._async_worker(scraper) for _ in range(workers)))
+                asyncio.run(_main())
+            interrupted=False
+        finally:
+            self._finish_pool.shutdown(wait=True)
+            self._drain_writer(interrupted)
+
+    def politeness_metrics(self)->dict:
+        per=[c.metrics() for c in self.controllers]
+        requests_n=sum(m['requests'] for m in per)
+        lat=[m['ewma_latency_s'] for m in per if m['ewma_latency_s'] is not None]
+        return {
+            "workers": per,
+            "rate_per_min": round(sum(m['rate_per_min'] or 0 for m in per), 1),
+            "avg_delay_s": round(sum(m['delay_s'] for m in per)/len(per), 3) if per else None,
+            "ewma_latency_s": round(sum(lat)/len(lat), 3) if lat else None,
+            "requests": requests_n,
+            "timeouts": sum(m['timeouts'] for m in per),
+            "timeout_rate": round(sum(m['timeouts'] for m in per)/requests_n, 3) if requests_n else 0.0,
+        }
+
+    def interrupt(self, remark:str):
+        with self.lock:
+            self.stop.set()
+            for t in list(self.in_flight.values()):
+                self.sheets.update_target_status(t['row'], "Pending", remark)
+            self.in_flight.clear()
+
 # ==================== MAIN ENTRY ====================
 
 def main():
@@ -916,6 +2095,11 @@ def main():
     parser.add_argument("--apply-font", action="store_true", help="Apply Quantico font to all Google Sheets")
     parser.add_argument("--apply-font-only", action="store_true", help="Apply Quantico font to all Google Sheets and exit")
     parser.add_argument("--no-apply-font", action="store_true", help="Do not apply Quantico font")
+    parser.add_argument("--workers", type=int, default=SCRAPE_WORKERS, help="Parallel scraper workers (browser engine: one Chrome each)")
+    parser.add_argument("--engine", choices=["browser","http","async"], default=SCRAPE_ENGINE if SCRAPE_ENGINE in {"browser","http","async"} else "browser", help="Profile fetch engine (http/async = Chrome only for login)")
+    parser.add_argument("--concurrency", type=int, default=ASYNC_CONCURRENCY, help="In-flight page fetches for --engine async")
+    parser.add_argument("--cache-ttl", type=float, default=PROFILE_CACHE_TTL, help="Serve profiles scraped within this many seconds from the local cache (0 = off)")
+    parser.add_argument("--deadline", type=float, default=RUN_DEADLINE_MINUTES, help="Stop starting new targets this many minutes after launch (0 = no limit)")
     args = parser.parse_args()
 
     is_interactive = sys.stdin.isatty() and not os.getenv('GITHUB_ACTIONS')
@@ -948,16 +2132,24 @@ def main():
     header.add_row("DamaDam Target Bot", "v3.2.1")
     header.add_row("Batch Size", str(args.batch_size))
     header.add_row("Profiles", "All" if args.max_profiles == 0 else str(args.max_profiles))
+    header.add_row("Engine", args.engine)
+    header.add_row("Workers", str(args.workers))
+    header.add_row("Deadline", f"{args.deadline:g} min" if args.deadline > 0 else "None")
     console.print(Panel(header, title="Run Config", border_style="magenta"))
     print("\n"+"="*70)
     print("  [TARGET] DamaDam Target Bot v3.2.1 (Single File)")
     print("="*70)
     if not USERNAME or not PASSWORD: print("[ERROR] Missing DAMADAM_USERNAME / DAMADAM_PASSWORD"); sys.exit(1)
+    try:
+        tracer.open(TRACE_PATH)
+    except Exception as e:
+        log_msg(f"Trace file unavailable: {e}")
     log_msg("Connecting to Google Sheets...")
     if IS_CI:
-        client = gsheets_client(); sheets = Sheets(client)
+        with tracer.span("sheets_init"):
+            client = gsheets_client(); sheets = Sheets(client)
     else:
-        with Status("🔌 Connecting to Google Sheets...", console=console, spinner="dots"):
+        with Status("🔌 Connecting to Google Sheets...", console=console, spinner="dots"), tracer.span("sheets_init"):
             client = gsheets_client(); sheets = Sheets(client)
 
     apply_font = (not args.no_apply_font) and (args.apply_font_only or args.apply_font or APPLY_FONT_FORMATTING or True)
@@ -972,98 +2164,125 @@ def main():
         log_msg("Font formatting complete (apply-font-only). Exiting.")
         return
 
-    log_msg("Setting up browser...")
-    if IS_CI:
-        driver = setup_browser()
-    else:
-        with Status("🌐 Launching Chrome...", console=console, spinner="dots"):
-            driver = setup_browser()
-    if not driver: print("[ERROR] Browser setup failed"); sys.exit(1)
+    journal = None
     try:
-        log_msg("Logging in...")
+        journal = ScrapeJournal()
+        sheets.on_flush = journal.commit
+        # Finish work a killed run already paid for before scraping anything new
+        replay_journal(sheets, journal)
+    except Exception as e:
+        log_msg(f"Scrape journal unavailable: {e}")
+
+    driver=None; http_scraper=None
+    pool_size = max(HTTP_POOL_SIZE, args.concurrency) if args.engine == "async" else max(HTTP_POOL_SIZE, args.workers)
+    if args.engine in {"http","async"}:
+        saved = load_saved_session()
+        if validate_session(saved):
+            # Session still good: the HTTP engines need no browser at all
+            http_scraper = HttpScraper(new_http_session(pool_size, saved))
+            log_msg("[OK] HTTP engine ready from saved session, browser not started")
+    if not http_scraper:
+        log_msg("Setting up browser...")
         if IS_CI:
-            ok = login(driver)
+            driver = setup_browser()
         else:
-            with Status("🔐 Logging in...", console=console, spinner="dots"):
+            with Status("🌐 Launching Chrome...", console=console, spinner="dots"):
+                driver = setup_browser()
+        if not driver: print("[ERROR] Browser setup failed"); sys.exit(1)
+    run=None
+    try:
+        if driver:
+            log_msg("Logging in...")
+            if IS_CI:
                 ok = login(driver)
-        if not ok: print("[ERROR] Login failed"); driver.quit(); sys.exit(1)
+            else:
+                with Status("🔐 Logging in...", console=console, spinner="dots"):
+                    ok = login(driver)
+            if not ok: print("[ERROR] Login failed"); driver.quit(); sys.exit(1)
+
+        if args.engine in {"http","async"} and not http_scraper:
+            # Chrome is only needed for login; profile pages come over pooled HTTP with its cookies
+            http_scraper = HttpScraper(http_session_from_driver(driver, pool_size=pool_size))
+            try: driver.quit()
+            except: pass
+            driver = None
+            log_msg("HTTP engine ready, browser closed")
 
         log_msg("Fetching pending targets...")
         if IS_CI:
-            targets = get_pending_targets(sheets)
+            with tracer.span("target_read"):
+                targets = get_pending_targets(sheets)
         else:
-            with Status("📥 Reading Target sheet...", console=console, spinner="dots"):
+            with Status("📥 Reading Target sheet...", console=console, spinner="dots"), tracer.span("target_read"):
                 targets = get_pending_targets(sheets)
         if not targets: log_msg("No pending targets."); return
+        cache = None
+        try:
+            cache = ProfileCache(ttl=args.cache_ttl)
+            evicted = cache.evict()
+            if evicted: log_msg(f"Profile cache: evicted {evicted} stale entries")
+        except Exception as e:
+            log_msg(f"Profile cache unavailable: {e}")
+        failures = {}
+        if cache:
+            try: failures = cache.recent_failures()
+            except Exception as e: log_msg(f"Failure log unavailable: {e}")
+        targets = prioritize_targets(sheets, targets, failures)
         # Enforce max profiles strictly
         to_process = targets[:args.max_profiles] if args.max_profiles > 0 else targets
-        success=failed=suspended_count=0
-        run_stats={"new":0,"updated":0,"unchanged":0}
-        start_time=time.time(); run_started=get_pkt_time()
+        run_started=get_pkt_time()
         trigger_type="Scheduled" if os.getenv('GITHUB_EVENT_NAME','').lower()=='schedule' else "Manual"
-        current_target=None
-        log_msg(f"Starting scrape of {len(to_process)} profiles...")
-        processed_count = 0
+        workers = max(1, min(args.workers, len(to_process)))
+        deadline = PROCESS_START + args.deadline*60 - DEADLINE_RESERVE_S if args.deadline > 0 else None
+        if deadline:
+            log_msg(f"Run deadline: {args.deadline:g} min from launch, {max(0, deadline-time.time())/60:.1f} min left for scraping")
+        run = ScrapeRun(sheets, to_process, args.batch_size, cache=cache, journal=journal, deadline=deadline)
+        factories = None
+        if args.engine == "async":
+            log_msg(f"Starting async scrape of {len(to_process)} profiles (concurrency {args.concurrency}, {ASYNC_RATE:g} req/s)...")
+        else:
+            log_msg(f"Starting scrape of {len(to_process)} profiles with {workers} worker(s)...")
+            if http_scraper:
+                factories = [lambda: http_scraper.scrape_profile] * workers
+            else:
+                main_driver = driver
+                factories = [lambda: (lambda nick, previous=None: scrape_profile(main_driver, nick, previous))]
+                factories += [lambda: start_browser_worker(run.drivers)] * (workers - 1)
         try:
-            with Progress(
-                SpinnerColumn(style="cyan"),
-                TextColumn("{task.description}"),
-                BarColumn(bar_width=30),
-                TextColumn("{task.completed}/{task.total}"),
-                TimeElapsedColumn(),
-                TimeRemainingColumn(),
-                console=console,
-                transient=False,
-            ) as progress:
-                task_id = progress.add_task("Scraping profiles", total=len(to_process))
-                while processed_count < len(to_process):
-                    t = to_process[processed_count]
-                    current_target = t
-                    nick = t['nickname']; row = t['row']; source = t.get('source','Target') or 'Target'
-                    eta = calculate_eta(processed_count, len(to_process), start_time)
-                    progress.update(task_id, description=f"[{eta}] {nick}")
-                    try:
-                        prof = scrape_profile(driver, nick)
-                        if not prof:
-                            raise RuntimeError("Profile scrape failed")
-                        prof['SOURCE'] = source
-
-                        skip_reason = prof.get('__skip_reason')
-                        if skip_reason:
-                            sheets.write_profile(prof, old_row=row)
-                            sheets.update_target_status(row, "Error", f"{skip_reason} @ {get_pkt_time().strftime('%I:%M %p')}")
-                            failed += 1
-                        else:
-                            result = sheets.write_profile(prof, old_row=row)
-                            status = result.get("status","error") if result else "error"
-                            if status in {"new","updated","unchanged"}:
-                                success += 1
-                                run_stats[status] += 1
-                                sheets.update_target_status(row, "Done", f"{status} @ {get_pkt_time().strftime('%I:%M %p')}")
-                            else:
-                                raise RuntimeError(result.get("error","Write failed") if result else "Write failed")
-                    except Exception as e:
-                        sheets.update_target_status(row, "Pending", f"Retry needed: {e}")
-                        failed += 1
-                    current_target = None
-                    processed_count += 1
-                    progress.advance(task_id)
-                    if args.batch_size > 0 and processed_count % args.batch_size == 0 and processed_count < len(to_process):
-                        adaptive.on_batch(); time.sleep(3)
-                    adaptive.sleep()
+            if args.engine == "async":
+                run.run_async(AsyncHttpScraper(http_scraper, args.concurrency))
+            else:
+                run.run(factories)
         except KeyboardInterrupt:
             print("\n" + "-"*70)
             log_msg("Run interrupted by user")
-            if current_target:
-                sheets.update_target_status(current_target['row'], "Pending", f"Interrupted @ {get_pkt_time().strftime('%I:%M %p')}")
+            run.interrupt(f"Interrupted @ {get_pkt_time().strftime('%I:%M %p')}")
         except Exception as fatal:
             print("\n" + "-"*70)
             log_msg(f"Fatal error: {fatal}")
-            if current_target:
-                sheets.update_target_status(current_target['row'], "Pending", f"Run error: {fatal}")
+            run.interrupt(f"Run error: {fatal}")
+            sheets.flush()
             return
+        success, failed, suspended_count, run_stats = run.success, run.failed, run.suspended_count, run.run_stats
+        sheets.flush()
         print("-"*70)
-        log_msg(f"[COMPLETE] Run completed: {success} success, {failed} failed, {suspended_count} suspended")
+        log_msg(f"[COMPLETE] Run completed: {success} success, {failed} failed, {suspended_count} suspended, {run.recent_post_skips} recent-post fetches skipped")
+        if run.deadline_hit:
+            log_msg(f"Stopped at the run deadline; {run.total - run.processed} targets left pending for the next run")
+        pm = run.politeness_metrics()
+        log_msg(f"Politeness: ~{pm['rate_per_min']} req/min across {len(pm['workers'])} controller(s), avg delay {pm['avg_delay_s']}s, latency {pm['ewma_latency_s']}s, timeout rate {pm['timeout_rate']:.1%}")
+        log_msg(f"Sheets API: {sheets.api.calls['read']} reads, {sheets.api.calls['write']} writes, {sheets.api.retries} retries, {sheets.api.throttled_s:.1f}s throttled")
+        log_msg(f"Sheets writer: {run.writer.jobs} jobs, scrapers blocked {run.writer.blocked_s:.1f}s on a full queue")
+        phases = tracer.summary()
+        for phase, st in sorted(phases.items(), key=lambda kv: -kv[1]['total_s']):
+            log_msg(f"Phase {phase:<14} n={st['n']:<5} p50 {st['p50_s']:.3f}s  p95 {st['p95_s']:.3f}s  total {st['total_s']:.1f}s")
+        for metric, st in tracer.value_summary().items():
+            log_msg(f"Metric {metric:<13} n={st['n']:<5} avg {st['avg']:.2f}  p50 {st['p50']:.2f}  p95 {st['p95']:.2f}")
+        duration = time.time() - run.start_time
+        per_profile = phases.get("profile", {})
+        if cache:
+            cs = cache.stats()
+            log_msg(f"Profile cache: {cs['hits']} hits, {cs['misses']} misses ({cs['hit_rate']:.0%}), {cs['entries']} entries")
         sheets.update_dashboard({
             "Run Number":1,
             "Last Run": get_pkt_time().strftime("%d-%b-%y %I:%M %p"),
@@ -1076,11 +2295,25 @@ def main():
             "Trigger": trigger_type,
             "Start": run_started.strftime("%d-%b-%y %I:%M %p"),
             "End": get_pkt_time().strftime("%d-%b-%y %I:%M %p"),
+            "Duration": round(duration, 1),
+            "Profiles/min": round(run.processed*60/duration, 2) if duration > 0 else 0,
+            "P50": per_profile.get("p50_s", ""),
+            "P95": per_profile.get("p95_s", ""),
         })
         print("="*70)
     finally:
-        try: driver.quit()
-        except: pass
+        sheets.flush()
+        for d in ([driver] if driver else []) + (run.drivers if run else []):
+            try: d.quit()
+            except: pass
+        if run and run.cache: run.cache.close()
+        if journal:
+            try: journal.compact()
+            except Exception as e: log_msg(f"Journal compaction failed: {e}")
+            journal.close()
+        tracer.close(sheets_reads=sheets.api.calls['read'], sheets_writes=sheets.api.calls['write'],
+                     sheets_retries=sheets.api.retries, phases=tracer.summary(), metrics=tracer.value_summary(),
+                     lean_browser=LEAN_BROWSER)
 
 if __name__=='__main__':
     main()
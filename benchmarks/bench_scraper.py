@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the DamaDam Target Bot.
+
+Replays stub profile / public-post / suspended / unverified pages through the
+extraction code and drives the Sheets class against benchmarks/fake_gspread.py,
+so no browser, network or Google account is needed.
+
+  python benchmarks/bench_scraper.py
+  python benchmarks/bench_scraper.py --rows 1000 10000 100000 --profiles 500
+  python benchmarks/bench_scraper.py --json > bench_output.txt
+  python benchmarks/bench_scraper.py --storm-write-quota 10 --latency 0.2
+  python benchmarks/bench_scraper.py --check
+
+The fixtures are small hand-written stubs carrying the markup the selectors
+target, so extraction pages/sec is parser overhead, not real page cost.
+
+Every run first checks the parsers' output field by field against the
+<name>.expected.json beside each fixture and exits non-zero on any mismatch
+(--check stops there). Then it reports extraction pages/sec, Sheets profiles/sec, Sheets API calls per
+profile and peak Python memory per existing-row size. The quota-storm bench
+replays the same write path against a fake that enforces a per-minute quota,
+on a virtual clock, with and without client-side pacing.
+"""
+
+import os, sys, time, json, random, argparse, tempfile, tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+# Must be set before Scraper is imported: quota pacing would otherwise dominate the timings
+os.environ.setdefault("SHEETS_READ_QUOTA", "0")
+os.environ.setdefault("SHEETS_WRITE_QUOTA", "0")
+os.environ.setdefault("GOOGLE_SHEET_URL", "fake://bench")
+os.environ.setdefault("TAGS_CACHE_PATH", "")  # bench_tags points it at a temp file itself
+
+import Scraper as S
+from fake_gspread import FakeClient, FakeClock
+
+FIXTURES = {
+    "profile": "profile.html",
+    "public_posts": "public_posts.html",
+    "suspended": "suspended.html",
+    "unverified": "unverified.html",
+}
+
+def load_fixture(name:str)->str:
+    with open(os.path.join(FIXTURES_DIR, FIXTURES[name]), encoding="utf-8") as f:
+        return f.read()
+
+def quiet():
+    S.log_msg = lambda m: None
+
+class VirtualTime:
+    # Swapped in for Scraper's time module during storm runs so backoff sleeps advance the FakeClock
+    def __init__(self, clock:FakeClock):
+        self.clock = clock; self.epoch = time.time()
+    def sleep(self, seconds): self.clock.sleep(seconds)
+    def monotonic(self): return self.clock.monotonic()
+    def time(self): return self.epoch + self.clock.now
+    def __getattr__(self, name): return getattr(time, name)
+
+# ---------------- fixture checks ----------------
+
+def _expected_value(value):
+    # {"relative": "3 years ago"} is page text the parser turns into a date relative to today
+    if isinstance(value, dict) and "relative" in value:
+        return S.convert_relative_date_to_absolute(value["relative"])
+    return value
+
+def verify_fixtures()->list:
+    # Each <name>.html with a <name>.expected.json beside it is parsed and compared field by field
+    failures = []
+    for spec_name in sorted(f for f in os.listdir(FIXTURES_DIR) if f.endswith(".expected.json")):
+        page = spec_name[:-len(".expected.json")]
+        with open(os.path.join(FIXTURES_DIR, spec_name), encoding="utf-8") as f:
+            spec = json.load(f)
+        with open(os.path.join(FIXTURES_DIR, page+".html"), encoding="utf-8") as f:
+            html = f.read()
+        if spec["parser"] == "profile":
+            got = S.parse_profile_html(html, spec["nickname"])
+        else:
+            got = S.parse_public_posts_html(html)
+        if got is None:
+            failures.append(f"{page}: parser returned None"); continue
+        got = dict(got)
+        # Scrape timestamp is wall-clock; only its presence is checked
+        if spec["parser"] == "profile" and not got.pop("DATETIME SCRAP", ""):
+            failures.append(f"{page}: DATETIME SCRAP is empty")
+        expected = {k: _expected_value(v) for k, v in spec["fields"].items()}
+        for key in sorted(set(got) | set(expected)):
+            if got.get(key) != expected.get(key):
+                failures.append(f"{page}: {key} = {got.get(key)!r}, expected {expected.get(key)!r}")
+        if "friend_status" in spec:
+            status = S.parse_friend_status_html(html)
+            if status != spec["friend_status"]:
+                failures.append(f"{page}: friend status = {status!r}, expected {spec['friend_status']!r}")
+    return failures
+
+# ---------------- extraction ----------------
+
+def bench_extraction(iterations:int)->list:
+    pages = {name: load_fixture(name) for name in FIXTURES}
+    cases = [
+        ("parse_profile_html", "profile", lambda html: S.parse_profile_html(html, "Ayesha_Khan")),
+        ("parse_profile_html", "suspended", lambda html: S.parse_profile_html(html, "Fake_Acc_77")),
+        ("parse_profile_html", "unverified", lambda html: S.parse_profile_html(html, "new_user_2025")),
+        ("parse_public_posts_html", "public_posts", S.parse_public_posts_html),
+        ("parse_friend_status_html", "profile", S.parse_friend_status_html),
+    ]
+    results = []
+    for fn_name, page, fn in cases:
+        html = pages[page]
+        fn(html)  # warm-up
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn(html)
+        elapsed = time.perf_counter() - started
+        results.append({"bench": "extract", "fn": fn_name, "page": page, "iterations": iterations,
+                        "pages_per_s": round(iterations/elapsed, 1), "ms_per_page": round(elapsed*1000/iterations, 3)})
+    return results
+
+# ---------------- sheets ----------------
+
+def _existing_row(i:int)->list:
+    vals = {c: "" for c in S.COLUMN_ORDER}
+    vals.update({
+        "NICK NAME": f"user_{i}", "CITY": random.choice(["Lahore","Karachi","Islamabad",""]),
+        "GENDER": random.choice(["Male","Female"]), "MARRIED": random.choice(["Yes","No",""]),
+        "AGE": "25 - 34", "JOINED": "01-Jan-23", "FOLLOWERS": str(i % 997), "STATUS": "Normal",
+        "POSTS": str(i % 311), "INTRO": "bench intro", "SOURCE": "Target", "DATETIME SCRAP": "01-Jan-25 10:00 AM",
+        "PROFILE LINK": f"https://damadam.pk/users/user_{i}", "POST URL": f"https://damadam.pk/profile/public/user_{i}",
+    })
+    return [vals[c] for c in S.COLUMN_ORDER]
+
+def build_client(existing_rows:int, profiles:int, tag_columns:int=20, **fake_kwargs)->FakeClient:
+    random.seed(existing_rows)
+    client = FakeClient(**fake_kwargs)
+    ss = client.spreadsheet
+    ss.seed("ProfilesTarget", [list(S.COLUMN_ORDER)] + [_existing_row(i) for i in range(existing_rows)])
+    # Half of the targets refresh existing profiles, half are new nicknames
+    targets = [[f"user_{i}" if k % 2 == 0 else f"new_user_{i}", S.TARGET_STATUS_PENDING, "", "Target"]
+               for k, i in enumerate(random.sample(range(max(existing_rows, profiles)), profiles))]
+    ss.seed("Target", [["Nickname","Status","Remarks","Source"]] + targets)
+    # Tagged nicknames live in their own namespace so TAGS never flips a benchmark row to "updated"
+    tag_rows = max(1, existing_rows // 10)
+    ss.seed("Tags", [[f"TAG{c}" for c in range(tag_columns)]] +
+            [[f"tagged_{random.randrange(max(existing_rows,1))}" for _ in range(tag_columns)] for _ in range(tag_rows)])
+    ss.seed("Dashboard", [list(S.DASHBOARD_HEADERS)])
+    return client
+
+def _scraped_profile(sheets, nick:str, k:int)->dict:
+    ex = sheets.existing.get(nick.lower())
+    if ex and k % 3 != 0:
+        # Two out of three refreshes come back unchanged, like most real re-scrapes
+        prof = dict(zip(S.COLUMN_ORDER, ex["data"]))
+    else:
+        prof = dict(zip(S.COLUMN_ORDER, _existing_row(k)))
+        prof["NICK NAME"] = nick; prof["FOLLOWERS"] = str(k)
+    prof["SOURCE"] = "Target"
+    return prof
+
+def _write_targets(sheets, targets:list)->dict:
+    statuses = {"new":0,"updated":0,"unchanged":0,"error":0}
+    for k, t in enumerate(targets):
+        prof = _scraped_profile(sheets, t["nickname"], k)
+        statuses[S.record_profile_result(sheets, t["row"], prof)] += 1
+    sheets.flush()
+    return statuses
+
+def bench_sheets(existing_rows:int, profiles:int)->dict:
+    client = build_client(existing_rows, profiles)
+    tracemalloc.start()
+    started = time.perf_counter()
+    sheets = S.Sheets(client)
+    init_s = time.perf_counter() - started
+    init_calls = dict(client.calls)
+    targets = S.get_pending_targets(sheets)
+
+    started = time.perf_counter()
+    statuses = _write_targets(sheets, targets)
+    write_s = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    n = max(len(targets), 1)
+    return {
+        "bench": "sheets", "existing_rows": existing_rows, "profiles": len(targets),
+        "init_s": round(init_s, 3), "init_reads": init_calls["read"], "init_writes": init_calls["write"],
+        "write_s": round(write_s, 3), "profiles_per_s": round(len(targets)/write_s, 1) if write_s > 0 else None,
+        "writes_per_profile": round((client.calls["write"]-init_calls["write"])/n, 3),
+        "reads_per_profile": round((client.calls["read"]-init_calls["read"])/n, 3),
+        "peak_mem_mb": round(peak/1e6, 1), **statuses,
+    }
+
+def bench_tags(existing_rows:int)->dict:
+    client = build_client(existing_rows, 1)
+    sheets = S.Sheets(client)
+    tags_rows = client.spreadsheet._sheets["Tags"].rows
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        S.TAGS_CACHE_PATH = os.path.join(tmp, "tags_index.json")
+        try:
+            for run in ("cold", "cached"):
+                sheets._snapshot["Tags"] = [list(r) for r in tags_rows]
+                started = time.perf_counter()
+                sheets._load_tags_mapping()
+                timings[run] = round(time.perf_counter()-started, 4)
+        finally:
+            S.TAGS_CACHE_PATH = ""
+    return {"bench": "tags", "existing_rows": existing_rows, "tagged_users": len(sheets.tags_mapping),
+            "load_s": timings["cold"], "cached_load_s": timings["cached"]}
+
+def bench_quota_storm(existing_rows:int, profiles:int, write_quota:int, latency:float, paced:bool, read_quota:int=60)->dict:
+    clock = FakeClock()
+    client = build_client(existing_rows, profiles, latency=latency, clock=clock,
+                          read_quota=read_quota, write_quota=write_quota)
+    real_time, S.time = S.time, VirtualTime(clock)
+    try:
+        started = time.perf_counter()
+        sheets = S.Sheets(client)
+        if paced:
+            sheets.api = S.SheetsThrottle(read_per_min=read_quota, write_per_min=write_quota)
+        targets = S.get_pending_targets(sheets)
+        client.reset_counters(); virtual_start = clock.now
+        statuses = _write_targets(sheets, targets)
+        flushed = not sheets.pending_writes()
+        real_s = time.perf_counter() - started
+    finally:
+        S.time = real_time
+    return {
+        "bench": "storm", "mode": "paced" if paced else "unpaced", "existing_rows": existing_rows,
+        "profiles": len(targets), "write_quota": write_quota, "latency_s": latency,
+        "virtual_s": round(clock.now - virtual_start, 1), "real_s": round(real_s, 3),
+        "writes": client.calls["write"], "rejected_429": client.rejected["write"],
+        "retries": sheets.api.retries, "throttled_s": round(sheets.api.throttled_s, 1),
+        "flushed": flushed, "errors": statuses["error"],
+        "top_methods": ",".join(f"{m}={n}" for m, n in client.method_calls.most_common(3)),
+    }
+
+# ---------------- report ----------------
+
+def print_table(rows:list):
+    if not rows: return
+    cols = [c for c in rows[0].keys() if c != "bench"]
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in cols))
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline DamaDam bot benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000], help="Existing ProfilesTarget row counts")
+    parser.add_argument("--profiles", type=int, default=200, help="Profiles written per Sheets run")
+    parser.add_argument("--iterations", type=int, default=200, help="Parses per extraction case")
+    parser.add_argument("--storm-write-quota", type=int, default=10, help="Per-minute write quota enforced by the fake in the storm bench (0 = skip)")
+    parser.add_argument("--storm-profiles", type=int, default=500, help="Profiles written per storm run")
+    parser.add_argument("--latency", type=float, default=0.2, help="Virtual seconds per fake API call in the storm bench")
+    parser.add_argument("--json", action="store_true", help="Emit JSON lines instead of tables")
+    parser.add_argument("--check", action="store_true", help="Only verify parser output against the fixtures")
+    args = parser.parse_args()
+    quiet()
+
+    failures = verify_fixtures()
+    for failure in failures: print(f"[FIXTURE] {failure}", file=sys.stderr)
+    if failures: sys.exit(1)
+    if args.check:
+        print("fixtures ok"); return
+
+    results = bench_extraction(args.iterations)
+    for rows in args.rows:
+        results.append(bench_sheets(rows, args.profiles))
+    for rows in args.rows:
+        results.append(bench_tags(rows))
+    if args.storm_write_quota > 0:
+        for paced in (False, True):
+            results.append(bench_quota_storm(min(args.rows), args.storm_profiles, args.storm_write_quota, args.latency, paced))
+
+    if args.json:
+        for r in results: print(json.dumps(r))
+        return
+    for kind in ("extract", "sheets", "tags", "storm"):
+        rows = [r for r in results if r["bench"] == kind]
+        if not rows: continue
+        print(f"== {kind} ==")
+        print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+In-memory stand-in for the part of gspread that Scraper.Sheets uses.
+
+Only what the bot calls is implemented: open_by_url, worksheets, worksheet,
+add_worksheet, values_batch_get, values_batch_update, batch_update
+(updateCells / deleteDimension / repeatCell), and on worksheets
+get_all_values, row_values, append_row(s), update, batch_update, add_cols, clear.
+
+Every call goes through FakeClient._call, which counts it (per read/write kind
+and per method), sleeps the configured latency and enforces an optional
+per-minute read/write quota by raising gspread's APIError 429, the same way
+the real API rejects a quota storm. Pass a FakeClock to make latency and
+quota windows virtual so storms replay in milliseconds.
+"""
+
+import time
+from collections import Counter, deque
+
+from gspread.exceptions import APIError, WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, fill_gaps, rowcol_to_a1
+
+
+def _split_range(rng: str):
+    # "'Target'!B2:C2" -> ("Target", "B2:C2"); "'Target'" -> ("Target", None)
+    if "!" in rng:
+        title, cells = rng.rsplit("!", 1)
+        return title.strip("'"), cells
+    return rng.strip("'"), None
+
+
+class FakeClock:
+    """Virtual clock: sleep() only advances now, so latency and quota windows cost no wall time."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        # Real sleeps always advance the clock a little; without that floor a sub-ulp wait would spin forever
+        self.now += max(1e-6, seconds)
+
+
+class FakeResponse:
+    # Just enough of requests.Response for gspread.exceptions.APIError
+    def __init__(self, status_code: int, message: str, status: str = "", headers=None):
+        self.status_code = status_code
+        self.text = message
+        self.headers = headers or {}
+        self._status = status
+
+    def json(self):
+        return {"error": {"code": self.status_code, "message": self.text, "status": self._status}}
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title: str, sheet_id: int, rows: int = 1000, cols: int = 26):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.row_count = rows
+        self.col_count = cols
+        self.rows = []
+        self.notes = {}
+
+    # ---- grid helpers (no API cost) ----
+
+    def _used_rows(self) -> int:
+        n = len(self.rows)
+        while n and not any(self.rows[n - 1]):
+            n -= 1
+        return n
+
+    def _set(self, r: int, c: int, value):
+        while len(self.rows) <= r:
+            self.rows.append([])
+        row = self.rows[r]
+        if len(row) <= c:
+            row.extend([""] * (c + 1 - len(row)))
+        row[c] = "" if value is None else str(value)
+
+    def _write(self, cells, values):
+        grid = a1_range_to_grid_range(cells) if cells else {}
+        r0 = grid.get("startRowIndex", 0)
+        c0 = grid.get("startColumnIndex", 0)
+        for i, row in enumerate(values):
+            for j, value in enumerate(row):
+                self._set(r0 + i, c0 + j, value)
+
+    def _values(self):
+        return fill_gaps([list(r) for r in self.rows[: self._used_rows()]])
+
+    def _append(self, values):
+        start = self._used_rows()
+        for i, row in enumerate(values):
+            for j, value in enumerate(row):
+                self._set(start + i, j, value)
+        self.row_count = max(self.row_count, start + len(values))
+        width = max((len(r) for r in values), default=1)
+        return {
+            "spreadsheetId": self.spreadsheet.id,
+            "updates": {
+                "updatedRange": f"'{self.title}'!A{start + 1}:{rowcol_to_a1(start + len(values), width)}",
+                "updatedRows": len(values),
+            },
+        }
+
+    # ---- gspread surface ----
+
+    def get_all_values(self, *args, **kwargs):
+        self.spreadsheet._call("read", "get_all_values")
+        return self._values()
+
+    def row_values(self, row: int, *args, **kwargs):
+        self.spreadsheet._call("read", "row_values")
+        vals = list(self.rows[row - 1]) if row - 1 < len(self.rows) else []
+        while vals and not vals[-1]:
+            vals.pop()
+        return vals
+
+    def append_row(self, values, **kwargs):
+        self.spreadsheet._call("write", "append_row")
+        return self._append([values])
+
+    def append_rows(self, values, **kwargs):
+        self.spreadsheet._call("write", "append_rows")
+        return self._append(values)
+
+    def update(self, values=None, range_name=None, **kwargs):
+        self.spreadsheet._call("write", "update")
+        self._write(range_name, values or [])
+        return {"updatedRange": f"'{self.title}'!{range_name}"}
+
+    def batch_update(self, data, **kwargs):
+        self.spreadsheet._call("write", "batch_update")
+        for item in data:
+            self._write(item["range"], item["values"])
+        return {}
+
+    def add_cols(self, cols: int):
+        self.spreadsheet._call("write", "add_cols")
+        self.col_count += cols
+        return {}
+
+    def clear(self):
+        self.spreadsheet._call("write", "clear")
+        self.rows = []
+        return {}
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, sheet_id: str = "fake-spreadsheet"):
+        self.client = client
+        self.id = sheet_id
+        self._sheets = {}
+        self._next_id = 1
+
+    def _call(self, kind: str, method: str):
+        self.client._call(kind, method)
+
+    # Seeding helper for benchmarks; free of API cost
+    def seed(self, title: str, rows) -> FakeWorksheet:
+        ws = self._sheets.get(title) or self._new_sheet(title)
+        ws.rows = [list(r) for r in rows]
+        return ws
+
+    def _new_sheet(self, title: str, rows: int = 1000, cols: int = 26) -> FakeWorksheet:
+        ws = FakeWorksheet(self, title, self._next_id, rows, cols)
+        self._next_id += 1
+        self._sheets[title] = ws
+        return ws
+
+    def _by_id(self, sheet_id: int) -> FakeWorksheet:
+        for ws in self._sheets.values():
+            if ws.id == sheet_id:
+                return ws
+        raise KeyError(sheet_id)
+
+    def worksheets(self, *args, **kwargs):
+        self._call("read", "worksheets")
+        return list(self._sheets.values())
+
+    def worksheet(self, title: str):
+        self._call("read", "worksheet")
+        if title not in self._sheets:
+            raise WorksheetNotFound(title)
+        return self._sheets[title]
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26, index=None):
+        self._call("write", "add_worksheet")
+        return self._new_sheet(title, rows, cols)
+
+    def values_batch_get(self, ranges, params=None):
+        self._call("read", "values_batch_get")
+        out = []
+        for rng in ranges:
+            title, _ = _split_range(rng)
+            ws = self._sheets[title]
+            out.append({"range": rng, "majorDimension": "ROWS", "values": [list(r) for r in ws.rows[: ws._used_rows()]]})
+        return {"spreadsheetId": self.id, "valueRanges": out}
+
+    def values_batch_update(self, body=None):
+        self._call("write", "values_batch_update")
+        for item in (body or {}).get("data", []):
+            title, cells = _split_range(item["range"])
+            self._sheets[title]._write(cells, item["values"])
+        return {"spreadsheetId": self.id, "totalUpdatedRanges": len((body or {}).get("data", []))}
+
+    def batch_update(self, body):
+        self._call("write", "batch_update")
+        for req in body.get("requests", []):
+            if "updateCells" in req:
+                self._update_cells(req["updateCells"])
+            elif "deleteDimension" in req:
+                rng = req["deleteDimension"]["range"]
+                ws = self._by_id(rng["sheetId"])
+                if rng["dimension"] == "COLUMNS":
+                    for row in ws.rows:
+                        del row[rng["startIndex"]:rng["endIndex"]]
+                else:
+                    del ws.rows[rng["startIndex"]:rng["endIndex"]]
+            # repeatCell (font formatting) has no effect on values
+        return {"spreadsheetId": self.id, "replies": [{} for _ in body.get("requests", [])]}
+
+    def _update_cells(self, req):
+        rng = req["range"]
+        ws = self._by_id(rng["sheetId"])
+        r0 = rng.get("startRowIndex", 0)
+        c0 = rng.get("startColumnIndex", 0)
+        fields = req.get("fields", "*")
+        for i, row in enumerate(req.get("rows", [])):
+            for j, cell in enumerate(row.get("values", [])):
+                if "userEnteredValue" in cell:
+                    ws._set(r0 + i, c0 + j, next(iter(cell["userEnteredValue"].values()), ""))
+                elif "userEnteredValue" in fields or fields == "*":
+                    # Field listed in the mask but absent from the cell: the value is cleared
+                    ws._set(r0 + i, c0 + j, "")
+                if "note" in cell:
+                    ws.notes[(r0 + i, c0 + j)] = cell["note"]
+
+
+class FakeClient:
+    """
+    latency: seconds slept per call, either a float or a {method: seconds} dict
+    ("*" is the fallback). read_quota / write_quota: requests allowed per
+    rolling minute, 0 = unlimited. retry_after: send a Retry-After header on
+    429s; Google normally does not, so clients fall back to their own backoff.
+    """
+
+    def __init__(self, latency=0.0, read_quota: int = 0, write_quota: int = 0, clock=None, retry_after: bool = False):
+        self.spreadsheet = FakeSpreadsheet(self)
+        self.latency = latency
+        self.quota = {"read": read_quota, "write": write_quota}
+        self.clock = clock or time
+        self.retry_after = retry_after
+        self._window = {"read": deque(), "write": deque()}
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.calls = {"read": 0, "write": 0}
+        self.rejected = {"read": 0, "write": 0}
+        self.method_calls = Counter()
+        self.latency_s = 0.0
+
+    def _latency(self, method: str) -> float:
+        if isinstance(self.latency, dict):
+            return self.latency.get(method, self.latency.get("*", 0.0))
+        return self.latency
+
+    def _call(self, kind: str, method: str):
+        self.calls[kind] += 1
+        self.method_calls[method] += 1
+        delay = self._latency(method)
+        if delay > 0:
+            self.clock.sleep(delay)
+            self.latency_s += delay
+        limit = self.quota[kind]
+        if limit <= 0:
+            return
+        now = self.clock.monotonic()
+        window = self._window[kind]
+        while window and now - window[0] >= 60.0:
+            window.popleft()
+        if len(window) >= limit:
+            self.rejected[kind] += 1
+            headers = {"Retry-After": str(max(1, int(60.0 - (now - window[0])) + 1))} if self.retry_after else {}
+            raise APIError(FakeResponse(
+                429, f"Quota exceeded for quota metric '{kind.title()} requests' per minute per user",
+                "RESOURCE_EXHAUSTED", headers))
+        window.append(now)
+
+    def open_by_url(self, url: str) -> FakeSpreadsheet:
+        self._call("read", "open_by_url")
+        return self.spreadsheet